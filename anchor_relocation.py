@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Anchor Relocation
+
+Carries comment ranges from an old export of a document onto a re-export
+made after the text was edited. The paragraphs of both versions are hashed
+and diffed with Myers' linear-space algorithm; unchanged paragraphs map
+one-to-one without looking at their text, and only the stretches between
+them (edited, split, merged or inserted paragraphs) are diffed character by
+character. Each old range is mapped through that diff. A mapped range whose
+text no longer resembles the quoted text (SequenceMatcher ratio below
+MIN_SIMILARITY), or whose text was deleted outright, is searched for by its
+quoted text (normalized, then fuzzy matching) inside the edited stretch, and
+reported lost if that fails too.
+
+Besides the comments already in old.docx, a pending-targets file can give
+ranges planned against the old text that have not been applied yet:
+    [{"paragraph": 2, "start": 61, "end": 76, "comment": "Check this", "author": "Reviewer"}]
+
+Each range is anchored in new.docx as soon as its position is decided,
+splitting runs with split_runs_at_span from test4_docx_anchor_generator.py
+(splitting leaves the paragraph text, and so later positions, unchanged) and
+creating comments through bulk_comments.BulkCommentWriter. Offsets count the
+text of a body paragraph's runs (doc.paragraphs / paragraph.runs), the same
+text split_run_at_text matches against; tables are not covered.
+
+Usage:
+    python anchor_relocation.py old.docx new.docx output.docx [--pending pending.json]
+
+Example:
+    python anchor_relocation.py test_anchored.docx test_input_edited.docx test_relocated.docx
+"""
+
+import sys
+import json
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from docx import Document
+from docx.oxml.ns import qn
+
+from bulk_comments import BulkCommentWriter
+from comment_dedupe import comment_fingerprint, comment_range_texts, existing_fingerprints
+from comment_model import iter_comments
+from test4_docx_anchor_generator import split_runs_at_span
+from text_matching import find_match
+
+# A mapped range must still look this much like its quoted text to be kept
+MIN_SIMILARITY = 0.6
+
+
+# -- linear-space diff --
+
+def _middle_snake(a, alo, ahi, b, blo, bhi):
+    """
+    Return (x, y, u, v, d): the middle snake of a[alo:ahi] vs b[blo:bhi] as
+    offsets relative to alo/blo, and the edit distance d.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta & 1
+    forward = {1: 0}
+    backward = {1: 0}
+
+    for d in range((n + m + 1) // 2 + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[k - 1] < forward[k + 1]):
+                x = forward[k + 1]
+            else:
+                x = forward[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1) and x + backward[delta - k] >= n:
+                return x0, y0, x, y, 2 * d - 1
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[k - 1] < backward[k + 1]):
+                x = backward[k + 1]
+            else:
+                x = backward[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[k] = x
+            if not odd and -d <= delta - k <= d and x + forward[delta - k] >= n:
+                return n - x, m - y, n - x0, m - y0, 2 * d
+
+    raise AssertionError("no middle snake")
+
+
+def diff_matches(a, b):
+    """
+    Return the (i, j) index pairs of a longest common subsequence of a and b,
+    in increasing order, using O(len(a) + len(b)) space.
+    """
+    matches = []
+
+    def solve(alo, ahi, blo, bhi):
+        # Common prefix and suffix first: unchanged regions cost one comparison each
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        suffix = 0
+        while alo < ahi - suffix and blo < bhi - suffix and a[ahi - 1 - suffix] == b[bhi - 1 - suffix]:
+            suffix += 1
+        ahi -= suffix
+        bhi -= suffix
+
+        if alo < ahi and blo < bhi:
+            x, y, u, v, _ = _middle_snake(a, alo, ahi, b, blo, bhi)
+            solve(alo, alo + x, blo, blo + y)
+            matches.extend((alo + x + i, blo + y + i) for i in range(u - x))
+            solve(alo + u, ahi, blo + v, bhi)
+
+        matches.extend((ahi + i, bhi + i) for i in range(suffix))
+
+    solve(0, len(a), 0, len(b))
+    return matches
+
+
+# -- positions --
+
+def paragraph_text(paragraph) -> str:
+    return ''.join(run.text for run in paragraph.runs)
+
+
+def comment_ranges(doc: Document):
+    """
+    Map comment id -> (start paragraph, start offset, end paragraph, end offset)
+    for range markers that sit directly in body paragraphs.
+    """
+    range_start = qn('w:commentRangeStart')
+    range_end = qn('w:commentRangeEnd')
+    starts = {}
+    ranges = {}
+
+    for para_index, paragraph in enumerate(doc.paragraphs):
+        runs = iter(paragraph.runs)
+        offset = 0
+        for child in paragraph._p.iterchildren(qn('w:r'), range_start, range_end):
+            if child.tag == range_start:
+                starts[child.get(qn('w:id'))] = (para_index, offset)
+            elif child.tag == range_end:
+                comment_id = child.get(qn('w:id'))
+                if comment_id in starts:
+                    ranges[comment_id] = starts.pop(comment_id) + (para_index, offset)
+            else:
+                offset += len(next(runs).text)
+
+    return ranges
+
+
+class Relocator:
+    """Maps (paragraph, offset) positions in the old text onto the new text."""
+
+    def __init__(self, old_texts, new_texts):
+        self.old_texts = old_texts
+        self.new_texts = new_texts
+        self.region_of = {}  # old paragraph -> index into self.regions
+        self.regions = []
+
+        matched = diff_matches([hash(t) for t in old_texts], [hash(t) for t in new_texts])
+        matched = [(i, j) for i, j in matched if old_texts[i] == new_texts[j]]
+        self.same = dict(matched)  # old paragraph -> identical new paragraph
+
+        # Stretches between unchanged paragraphs, diffed by character on demand
+        previous = (-1, -1)
+        for i, j in matched + [(len(old_texts), len(new_texts))]:
+            old_range = range(previous[0] + 1, i)
+            new_range = range(previous[1] + 1, j)
+            if old_range:
+                for p in old_range:
+                    self.region_of[p] = len(self.regions)
+                self.regions.append({'old': old_range, 'new': new_range, 'matches': None})
+            previous = (i, j)
+
+    @staticmethod
+    def _join(texts, paragraphs):
+        starts = []
+        position = 0
+        for p in paragraphs:
+            starts.append(position)
+            position += len(texts[p]) + 1
+        return '\n'.join(texts[p] for p in paragraphs), starts
+
+    def _region_diff(self, region):
+        if region['matches'] is None:
+            old_text, region['old_starts'] = self._join(self.old_texts, region['old'])
+            new_text, region['new_starts'] = self._join(self.new_texts, region['new'])
+            region['new_text'] = new_text
+            region['matches'] = diff_matches(old_text, new_text)
+            region['old_positions'] = [i for i, _ in region['matches']]
+        return region
+
+    def _to_new(self, region, position):
+        """Global position in the region's new text -> (paragraph, offset)."""
+        starts = region['new_starts']
+        k = max(0, bisect_right(starts, position) - 1)
+        paragraph = region['new'][k]
+        return paragraph, min(position - starts[k], len(self.new_texts[paragraph]))
+
+    def range_text(self, start_para, start_offset, end_para, end_offset) -> str:
+        """Text of a range in the new text (paragraphs joined without separators, like comment_range_texts)."""
+        texts = self.new_texts
+        if start_para == end_para:
+            return texts[start_para][start_offset:end_offset]
+        return (texts[start_para][start_offset:] + ''.join(texts[p] for p in range(start_para + 1, end_para))
+                + texts[end_para][:end_offset])
+
+    def relocate(self, start_para, start_offset, end_para, end_offset, quoted=''):
+        """
+        Return (start para, start offset, end para, end offset, how) in the new
+        text, where how is 'unchanged', 'shifted' or 'searched', or None when
+        the range cannot be placed.
+        """
+        if start_para in self.same and end_para in self.same:
+            how = 'unchanged' if (start_para, end_para) == (self.same[start_para], self.same[end_para]) else 'shifted'
+            return self.same[start_para], start_offset, self.same[end_para], end_offset, how
+
+        start = self._map_edge(start_para, start_offset, is_start=True)
+        end = self._map_edge(end_para, end_offset, is_start=False)
+        if start and end and start < end:
+            mapped = start + end
+            if not quoted or SequenceMatcher(None, self.range_text(*mapped), quoted).ratio() >= MIN_SIMILARITY:
+                return mapped + ('shifted',)
+
+        # The range's own text was deleted or rewritten; look for the quoted text nearby
+        region_index = self.region_of.get(start_para, self.region_of.get(end_para))
+        if region_index is None or not quoted:
+            return None
+        region = self._region_diff(self.regions[region_index])
+        if not region['new']:
+            return None
+        for mode in ('normalized', 'fuzzy'):
+            span = find_match(region['new_text'], quoted, mode)
+            if span:
+                return self._to_new(region, span[0]) + self._to_new(region, span[1]) + ('searched',)
+        return None
+
+    def _map_edge(self, para, offset, is_start):
+        if para in self.same:
+            return self.same[para], offset
+        region = self.regions[self.region_of[para]]
+        if not region['new']:
+            return None
+        region = self._region_diff(region)
+        position = region['old_starts'][region['old'].index(para)] + offset
+        matches = region['matches']
+
+        if is_start:
+            # First surviving character at or after the old start
+            k = bisect_right(region['old_positions'], position - 1)
+            if k == len(matches):
+                return None
+            return self._to_new(region, matches[k][1])
+
+        # Just past the last surviving character before the old end
+        k = bisect_right(region['old_positions'], position - 1) - 1
+        if k < 0:
+            return None
+        return self._to_new(region, matches[k][1] + 1)
+
+
+# -- anchoring --
+
+def anchor_range(writer: BulkCommentWriter, paragraphs, start_para, start_offset, end_para, end_offset,
+                 text, author, date=None):
+    """Anchor a comment on the given range of the writer's document. Returns the comment id or None."""
+    if start_para == end_para:
+        runs = split_runs_at_span(paragraphs[start_para], start_offset, end_offset)
+    else:
+        first = paragraphs[start_para]
+        first_runs = split_runs_at_span(first, start_offset, len(paragraph_text(first)))
+        last_runs = split_runs_at_span(paragraphs[end_para], 0, end_offset)
+        runs = first_runs[:1] + last_runs[-1:]
+        if len(runs) < 2:
+            runs = []
+    if not runs:
+        return None
+
+    return writer.add(runs, text, author or "", date=date)
+
+
+def relocate_comments(old_doc: Document, new_doc: Document, pending=()):
+    """
+    Anchor old_doc's comments and the pending targets onto new_doc.
+
+    Returns a list of result dicts: source ('comment' or 'pending'), text,
+    quoted, old and new positions and status (unchanged, shifted, searched,
+    already present or lost).
+    """
+    old_paragraphs = old_doc.paragraphs
+    new_paragraphs = new_doc.paragraphs
+    old_texts = [paragraph_text(p) for p in old_paragraphs]
+    new_texts = [paragraph_text(p) for p in new_paragraphs]
+    relocator = Relocator(old_texts, new_texts)
+
+    items = []
+    ranges = comment_ranges(old_doc)
+    quoted_texts = comment_range_texts(old_doc)
+    for record in iter_comments(old_doc):
+        if record.id in ranges:
+            items.append(('comment', ranges[record.id], record.text, record.author, record.date,
+                          quoted_texts.get(record.id, "")))
+    for target in pending:
+        position = (target['paragraph'], target['start'], target['paragraph'], target['end'])
+        items.append(('pending', position, target['comment'], target.get('author') or "Anchor Generator",
+                      None, old_texts[target['paragraph']][target['start']:target['end']]))
+
+    # Positions are decided against new_texts; anchoring only splits runs,
+    # so those texts stay valid while comments are added one by one
+    seen = existing_fingerprints(new_doc, iter_comments(new_doc))
+    writer = BulkCommentWriter(new_doc)
+    results = []
+    for source, old_position, text, author, date, quoted in items:
+        new_position = relocator.relocate(*old_position, quoted=quoted)
+        result = {'source': source, 'text': text, 'quoted': quoted, 'old': old_position,
+                  'new': new_position[:4] if new_position else None,
+                  'status': new_position[4] if new_position else 'lost'}
+        results.append(result)
+        if new_position is None:
+            continue
+
+        sp, so, ep, eo = new_position[:4]
+        fingerprint = comment_fingerprint(relocator.range_text(sp, so, ep, eo), text, author)
+        if fingerprint in seen:
+            result['status'] = 'already present'
+            continue
+        if anchor_range(writer, new_paragraphs, sp, so, ep, eo, text, author, date) is None:
+            result['status'] = 'lost'
+            continue
+        seen.add(fingerprint)
+
+    writer.flush()
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+    pending = []
+    if '--pending' in args:
+        i = args.index('--pending')
+        with open(args[i + 1], 'r') as f:
+            pending = json.load(f)
+        del args[i:i + 2]
+
+    if len(args) < 3:
+        print("Usage: python anchor_relocation.py <old.docx> <new.docx> <output.docx> [--pending pending.json]")
+        sys.exit(1)
+
+    old_file, new_file, output_file = args[:3]
+
+    print(f"\n=== Anchor Relocation ===\n")
+    print(f"Old:     {old_file}")
+    print(f"New:     {new_file}")
+    print(f"Output:  {output_file}")
+    print(f"Pending: {len(pending)}\n")
+
+    new_doc = Document(new_file)
+    results = relocate_comments(Document(old_file), new_doc, pending)
+    new_doc.save(output_file)
+
+    lost = 0
+    for r in results:
+        label = f"{r['source']} '{r['text']}' on '{r['quoted']}'"
+        if r['status'] == 'lost':
+            lost += 1
+            print(f"✗ {label}: could not be placed")
+        else:
+            sp, so, ep, eo = r['new']
+            print(f"✓ {label}: {r['status']} -> paragraph {sp}:{so}..{ep}:{eo}")
+
+    print(f"\n✓ Saved: {output_file} ({len(results) - lost}/{len(results)} placed)")
+    if lost:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Anchor Store
+
+Local SQLite store for the Test 4 hybrid workflow: maps (document id, marker
+text of the DOCX-generated comment) to the kix anchor and quoted text Google
+assigned on import. Harvest every anchored comment of a document once, load
+the lot in a single transaction, then look anchors up by marker instead of
+listing and filtering all comments again for each one.
+
+The harvest file is the JSON file harvestAnchors() in
+apps_script_comments.js saves to Drive: a list of Drive comments with id,
+content, anchor and quotedFileContent.
+
+Usage:
+    python anchor_store.py import anchors.db <doc_id> harvest.json
+    python anchor_store.py lookup anchors.db <doc_id> "marker text"
+    python anchor_store.py list anchors.db <doc_id>
+
+Example:
+    python anchor_store.py import anchors.db 1AbCdEf harvest.json
+    python anchor_store.py lookup anchors.db 1AbCdEf "ANCHOR GENERATOR"
+"""
+
+import sys
+import json
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS anchors (
+    doc_id      TEXT NOT NULL,
+    marker      TEXT NOT NULL,
+    anchor      TEXT NOT NULL,
+    quoted      TEXT,
+    comment_id  TEXT,
+    PRIMARY KEY (doc_id, marker)
+) WITHOUT ROWID;
+"""
+
+
+class AnchorStore:
+    """(doc_id, marker) -> kix anchor mapping backed by SQLite."""
+
+    def __init__(self, path: str = "anchors.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add_many(self, doc_id: str, comments) -> int:
+        """
+        Store every anchored comment from a harvest in one transaction.
+
+        `comments` are Drive comment dicts; the comment content is the marker.
+        A later harvest replaces the anchor for the same marker. Returns the
+        number of rows written.
+        """
+        rows = []
+        for c in comments:
+            if not c.get('anchor') or not c.get('content'):
+                continue
+            quoted = c.get('quotedFileContent')
+            rows.append((
+                doc_id,
+                c['content'],
+                c['anchor'],
+                json.dumps(quoted) if quoted else None,
+                c.get('id'),
+            ))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO anchors (doc_id, marker, anchor, quoted, comment_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def lookup(self, doc_id: str, marker: str):
+        """Return {'anchor', 'quotedFileContent', 'comment_id'} for a marker, or None."""
+        row = self.conn.execute(
+            "SELECT anchor, quoted, comment_id FROM anchors WHERE doc_id = ? AND marker = ?",
+            (doc_id, marker),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'anchor': row['anchor'],
+            'quotedFileContent': json.loads(row['quoted']) if row['quoted'] else None,
+            'comment_id': row['comment_id'],
+        }
+
+    def iter_document(self, doc_id: str):
+        """Yield (marker, anchor) pairs for a document."""
+        for row in self.conn.execute(
+            "SELECT marker, anchor FROM anchors WHERE doc_id = ? ORDER BY marker", (doc_id,)
+        ):
+            yield row['marker'], row['anchor']
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] not in ('import', 'lookup', 'list'):
+        print("Usage: python anchor_store.py import <anchors.db> <doc_id> <harvest.json>")
+        print("       python anchor_store.py lookup <anchors.db> <doc_id> <marker_text>")
+        print("       python anchor_store.py list <anchors.db> <doc_id>")
+        sys.exit(1)
+
+    command, db_path, doc_id = sys.argv[1:4]
+
+    with AnchorStore(db_path) as store:
+        if command == 'import':
+            if len(sys.argv) < 5:
+                print("Usage: python anchor_store.py import <anchors.db> <doc_id> <harvest.json>")
+                sys.exit(1)
+            with open(sys.argv[4], 'r') as f:
+                comments = json.load(f)
+            count = store.add_many(doc_id, comments)
+            print(f"✓ Stored {count} anchor(s) for {doc_id}")
+
+        elif command == 'lookup':
+            if len(sys.argv) < 5:
+                print("Usage: python anchor_store.py lookup <anchors.db> <doc_id> <marker_text>")
+                sys.exit(1)
+            found = store.lookup(doc_id, sys.argv[4])
+            if found is None:
+                print(f"✗ No anchor stored for '{sys.argv[4]}'")
+                sys.exit(1)
+            print(json.dumps(found, indent=2))
+
+        else:
+            for marker, anchor in store.iter_document(doc_id):
+                print(f"  {anchor}  '{marker}'")
+
+
+if __name__ == "__main__":
+    main()
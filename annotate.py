@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Batch DOCX Annotation
+
+Applies an annotation spec - a list of comments to anchor on target text -
+to a .docx in one load/save, using the run splitting and matching from
+test4_docx_anchor_generator.py through bulk_comments.BulkCommentWriter, so
+large specs scale linearly. Comments already present with the same comment
+text and author on the same matched text are skipped (see comment_dedupe.py).
+
+spec.json is a list of:
+    {"target": "quick brown fox", "comment": "Check this", "author": "Reviewer", "match": "exact"}
+Only "target" and "comment" are required.
+
+Usage:
+    python annotate.py input.docx output.docx spec.json
+
+Example:
+    python annotate.py test_input.docx test_annotated.docx spec.json
+"""
+
+import sys
+import json
+from docx import Document
+
+from bulk_comments import BulkCommentWriter
+from comment_dedupe import comment_fingerprint, existing_fingerprints
+from comment_model import iter_comments
+from test4_docx_anchor_generator import split_runs_at_span
+from text_matching import compile_matcher
+
+DEFAULT_AUTHOR = "Anchor Generator"
+
+
+def normalize_spec(annotations):
+    """
+    Return the spec as a list of dicts with every key filled in.
+
+    Raises ValueError for an unknown match mode or a regex that does not compile.
+    """
+    normalized = [
+        {
+            'target': a['target'],
+            'comment': a['comment'],
+            'author': a.get('author') or DEFAULT_AUTHOR,
+            'match': a.get('match') or 'exact',
+        }
+        for a in annotations
+    ]
+    for a in normalized:
+        compile_matcher(a['target'], a['match'])
+    return normalized
+
+
+def load_spec(path: str):
+    with open(path, 'r') as f:
+        return normalize_spec(json.load(f))
+
+
+def annotate_document(input_file: str, output_file: str, annotations):
+    """
+    Add every annotation to input_file and save the result to output_file.
+
+    Returns a report: {'added': n, 'skipped': n, 'missing': [target, ...]}.
+    """
+    doc = Document(input_file)
+    seen = existing_fingerprints(doc, iter_comments(doc))
+    report = {'added': 0, 'skipped': 0, 'missing': []}
+
+    with BulkCommentWriter(doc) as writer:
+        for a in normalize_spec(annotations):
+            found = writer.find_span(a['target'], mode=a['match'])
+            if found is None:
+                report['missing'].append(a['target'])
+                continue
+            # The matched text, not the target: they differ outside exact
+            # mode. Checked before splitting, so skips leave the runs alone
+            paragraph, start, end, matched = found
+            fingerprint = comment_fingerprint(matched, a['comment'], a['author'])
+            if fingerprint in seen:
+                report['skipped'] += 1
+                continue
+            writer.add(split_runs_at_span(paragraph, start, end), a['comment'], a['author'])
+            seen.add(fingerprint)
+            report['added'] += 1
+
+    doc.save(output_file)
+    return report
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python annotate.py <input.docx> <output.docx> <spec.json>")
+        sys.exit(1)
+
+    input_file, output_file, spec_file = sys.argv[1:4]
+    try:
+        annotations = load_spec(spec_file)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    print(f"\n=== Batch Annotation ===\n")
+    print(f"Input:       {input_file}")
+    print(f"Output:      {output_file}")
+    print(f"Annotations: {len(annotations)}")
+
+    report = annotate_document(input_file, output_file, annotations)
+
+    print(f"\n✓ Added {report['added']} comment(s), skipped {report['skipped']} already present")
+    for target in report['missing']:
+        print(f"✗ Could not find target text: '{target}'")
+    print(f"✓ Saved: {output_file}")
+
+    if report['missing']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Annotation Output Cache
+
+Content-addressed cache in front of annotate.annotate_document. The key is a
+SHA-256 of the input .docx bytes plus the normalized annotation spec, so a
+retried job or a second consumer asking for the same annotations on a
+byte-identical export gets the earlier output file and report back without
+loading, splitting or saving the document again.
+
+Entries live in a cache directory as <key>.docx and <key>.json (the report).
+The .json is written last and marks the entry complete. Hits refresh the
+entry's mtime, and when the directory grows past max_bytes the least recently
+used entries are removed.
+
+Usage:
+    python annotation_cache.py input.docx output.docx spec.json [--cache-dir DIR] [--max-mb N]
+    python annotation_cache.py stats [--cache-dir DIR]
+    python annotation_cache.py clear [--cache-dir DIR]
+
+Example:
+    python annotation_cache.py test_input.docx test_annotated.docx spec.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+from annotate import annotate_document, load_spec, normalize_spec
+
+DEFAULT_CACHE_DIR = '.annotation_cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Bump when annotate_document's output changes so old entries stop matching
+CACHE_VERSION = 1
+
+
+def cache_key(input_file: str, annotations) -> str:
+    """SHA-256 over the input bytes and the normalized spec."""
+    h = hashlib.sha256(f"annotate-v{CACHE_VERSION}\0".encode('utf-8'))
+    with open(input_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    h.update(b'\0')
+    h.update(json.dumps(normalize_spec(annotations), sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return h.hexdigest()
+
+
+class AnnotationCache:
+    """Size-bounded LRU of annotated outputs on disk. Safe to share between processes."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.docx', base + '.json'
+
+    def get(self, key: str, output_file: str):
+        """Copy the cached output to output_file and return its report, or None on a miss."""
+        docx_path, report_path = self._paths(key)
+        try:
+            with open(report_path, 'r') as f:
+                report = json.load(f)
+            shutil.copyfile(docx_path, output_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        now = time.time()
+        for path in (docx_path, report_path):
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                pass
+        return report
+
+    def _publish(self, path: str, write):
+        """Write through a fresh temp file and rename it onto path."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def put(self, key: str, output_file: str, report: dict):
+        docx_path, report_path = self._paths(key)
+        # Every write gets its own temp file (worker threads share a PID), and
+        # the rename means a concurrent reader never sees half an entry
+        def copy_output(f):
+            with open(output_file, 'rb') as src:
+                shutil.copyfileobj(src, f)
+
+        self._publish(docx_path, copy_output)
+        self._publish(report_path, lambda f: f.write(json.dumps(report).encode('utf-8')))
+        self.evict()
+
+    def entries(self):
+        """Complete entries as (last used, total bytes, key), oldest first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            docx_path, report_path = self._paths(key)
+            try:
+                report_stat = os.stat(report_path)
+                size = report_stat.st_size + os.path.getsize(docx_path)
+            except FileNotFoundError:
+                continue
+            entries.append((report_stat.st_mtime, size, key))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key)[::-1]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        for _, _, key in self.entries():
+            for path in self._paths(key)[::-1]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def cached_annotate(input_file: str, output_file: str, annotations, cache: AnnotationCache):
+    """
+    annotate_document with a cache in front.
+
+    Returns (report, hit) where hit says whether the output came from the cache.
+    """
+    key = cache_key(input_file, annotations)
+    report = cache.get(key, output_file)
+    if report is not None:
+        return report, True
+    report = annotate_document(input_file, output_file, annotations)
+    cache.put(key, output_file, report)
+    return report, False
+
+
+def main():
+    args = sys.argv[1:]
+    cache_dir = DEFAULT_CACHE_DIR
+    max_bytes = DEFAULT_MAX_BYTES
+    if '--cache-dir' in args:
+        i = args.index('--cache-dir')
+        cache_dir = args[i + 1]
+        del args[i:i + 2]
+    if '--max-mb' in args:
+        i = args.index('--max-mb')
+        max_bytes = int(float(args[i + 1]) * 1024 * 1024)
+        del args[i:i + 2]
+
+    cache = AnnotationCache(cache_dir, max_bytes)
+
+    if args[:1] == ['stats']:
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"Cache:   {cache_dir}")
+        print(f"Entries: {len(entries)}")
+        print(f"Size:    {total / 1024 / 1024:.1f} MB of {max_bytes / 1024 / 1024:.1f} MB")
+        return
+
+    if args[:1] == ['clear']:
+        cache.clear()
+        print(f"✓ Cleared {cache_dir}")
+        return
+
+    if len(args) < 3:
+        print("Usage: python annotation_cache.py <input.docx> <output.docx> <spec.json> [--cache-dir DIR] [--max-mb N]")
+        print("       python annotation_cache.py stats|clear [--cache-dir DIR]")
+        sys.exit(1)
+
+    input_file, output_file, spec_file = args[:3]
+    try:
+        annotations = load_spec(spec_file)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    report, hit = cached_annotate(input_file, output_file, annotations, cache)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print("\n=== Cached Annotation ===\n")
+    print(f"Input:  {input_file}")
+    print(f"Output: {output_file}")
+    print(f"Cache:  {'hit' if hit else 'miss'} ({elapsed:.1f}ms)")
+    print(f"\n✓ Added {report['added']} comment(s), skipped {report['skipped']} already present")
+    for target in report['missing']:
+        print(f"✗ Could not find target text: '{target}'")
+    print(f"✓ Saved: {output_file}")
+
+    if report['missing']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Annotation Daemon
+
+Keeps python-docx and the annotation code imported in a long-running local
+process so each job skips interpreter start-up and imports. Jobs are posted
+to a localhost HTTP API, queued, and run by a small worker pool.
+
+API (JSON):
+    POST /jobs        {"type": "annotate", "input": "in.docx", "output": "out.docx",
+                       "annotations": [...spec as in annotate.py...]}
+                      {"type": "list_comments", "input": "in.docx"}
+                      -> {"id": "<job id>"}
+    GET  /jobs/<id>   -> status (queued | running | done | failed), result, timings
+    GET  /stats       -> queue depth, jobs by status, per-job latency percentiles
+
+File paths are read and written by the daemon, so they must be visible to it.
+The client side only uses urllib, keeping `submit` cheap to start. With
+--cache, annotate jobs go through annotation_cache.py, so repeats of the same
+input bytes and spec return the earlier output.
+
+Usage:
+    python annotation_daemon.py serve [--port 8766] [--workers 2] [--cache DIR]
+    python annotation_daemon.py submit input.docx output.docx spec.json [--port 8766]
+    python annotation_daemon.py list input.docx [--port 8766]
+    python annotation_daemon.py stats [--port 8766]
+
+Example:
+    python annotation_daemon.py serve &
+    python annotation_daemon.py submit test_input.docx test_annotated.docx spec.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import threading
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+DEFAULT_PORT = 8766
+MAX_FINISHED_JOBS = 10000
+
+
+class JobQueue:
+    """Job records plus the queue feeding the workers."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.jobs = {}
+        self.finished = []
+        self.lock = threading.Lock()
+
+    def submit(self, spec: dict) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        with self.lock:
+            self.jobs[job_id] = {
+                'id': job_id,
+                'type': spec.get('type', 'annotate'),
+                'status': 'queued',
+                'submitted': time.time(),
+                'spec': spec,
+            }
+        self.queue.put(job_id)
+        return job_id
+
+    def get(self, job_id: str):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return {k: v for k, v in job.items() if k != 'spec'} if job else None
+
+    def finish(self, job_id: str, status: str, **fields):
+        with self.lock:
+            job = self.jobs[job_id]
+            job.update(fields, status=status, finished=time.time())
+            job['latency_ms'] = round((job['finished'] - job['submitted']) * 1000, 2)
+            self.finished.append(job_id)
+            # Keep memory bounded on a daemon that runs for weeks
+            while len(self.finished) > MAX_FINISHED_JOBS:
+                self.jobs.pop(self.finished.pop(0), None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            by_status = {}
+            for job in self.jobs.values():
+                by_status[job['status']] = by_status.get(job['status'], 0) + 1
+            latencies = sorted(self.jobs[j]['latency_ms'] for j in self.finished if j in self.jobs)
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] if latencies else None
+
+        return {
+            'queue_depth': self.queue.qsize(),
+            'jobs': by_status,
+            'latency_ms': {'p50': pct(50), 'p95': pct(95), 'p99': pct(99), 'max': latencies[-1] if latencies else None},
+        }
+
+
+def run_job(spec: dict, cache=None):
+    """Execute one job spec and return its result."""
+    from annotate import annotate_document
+    from comment_model import iter_comments_in_file
+
+    if spec.get('type', 'annotate') == 'annotate':
+        if cache is None:
+            return annotate_document(spec['input'], spec['output'], spec.get('annotations', []))
+        from annotation_cache import cached_annotate
+        report, hit = cached_annotate(spec['input'], spec['output'], spec.get('annotations', []), cache)
+        return dict(report, cached=hit)
+
+    if spec['type'] == 'list_comments':
+        return [
+            {'id': r.id, 'author': r.author, 'date': r.date, 'text': r.text}
+            for r in iter_comments_in_file(spec['input'])
+        ]
+
+    raise ValueError(f"Unknown job type '{spec['type']}'")
+
+
+def worker(jobs: JobQueue, cache=None):
+    while True:
+        job_id = jobs.queue.get()
+        with jobs.lock:
+            job = jobs.jobs[job_id]
+            job['status'] = 'running'
+            job['started'] = time.time()
+            spec = job['spec']
+
+        started = time.perf_counter()
+        try:
+            result = run_job(spec, cache)
+        except Exception as e:
+            jobs.finish(job_id, 'failed', error=f"{type(e).__name__}: {e}",
+                        run_ms=round((time.perf_counter() - started) * 1000, 2))
+        else:
+            jobs.finish(job_id, 'done', result=result,
+                        run_ms=round((time.perf_counter() - started) * 1000, 2))
+
+
+def serve(port: int = DEFAULT_PORT, workers: int = 2, cache_dir: str = None):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    # Pay the heavy imports once, before the first job arrives
+    import annotate  # noqa: F401
+    import comment_model  # noqa: F401
+
+    cache = None
+    if cache_dir:
+        from annotation_cache import AnnotationCache
+        cache = AnnotationCache(cache_dir)
+
+    jobs = JobQueue()
+    for _ in range(workers):
+        threading.Thread(target=worker, args=(jobs, cache), daemon=True).start()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                return self._send(200, jobs.stats())
+            if self.path.startswith('/jobs/'):
+                job = jobs.get(self.path[len('/jobs/'):])
+                return self._send(200, job) if job else self._send(404, {'error': 'unknown job'})
+            self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                return self._send(404, {'error': 'not found'})
+            try:
+                spec = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            except ValueError:
+                return self._send(400, {'error': 'invalid JSON'})
+            if not isinstance(spec, dict):
+                return self._send(400, {'error': 'job must be a JSON object'})
+            if 'input' not in spec:
+                return self._send(400, {'error': "missing 'input'"})
+            self._send(202, {'id': jobs.submit(spec)})
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f"\n=== Annotation Daemon ===\n")
+    print(f"Listening: http://127.0.0.1:{port}")
+    print(f"Workers:   {workers}")
+    print(f"Cache:     {cache_dir or 'off'}")
+    print("\nPress Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+# -- client --
+
+def _call(port: int, method: str, path: str, body=None):
+    """Send one request to the daemon. Raises RuntimeError with the daemon's error on 4xx/5xx."""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urlrequest.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method,
+                             headers={'Content-Type': 'application/json'})
+    try:
+        with urlrequest.urlopen(req, timeout=30) as response:
+            return json.loads(response.read())
+    except urlerror.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get('error', e.reason)
+        except (ValueError, AttributeError):
+            message = e.reason
+        raise RuntimeError(f"Daemon returned {e.code} for {method} {path}: {message}") from None
+
+
+def submit_and_wait(port: int, spec: dict, poll: float = 0.02, timeout: float = 600):
+    """Submit a job and poll until it finishes. Returns the job record."""
+    job_id = _call(port, 'POST', '/jobs', spec)['id']
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = _call(port, 'GET', f"/jobs/{job_id}")
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(poll)
+    raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+
+
+def main():
+    args = sys.argv[1:]
+    port = DEFAULT_PORT
+    if '--port' in args:
+        i = args.index('--port')
+        port = int(args[i + 1])
+        del args[i:i + 2]
+
+    if not args or args[0] not in ('serve', 'submit', 'list', 'stats'):
+        print("Usage: python annotation_daemon.py serve [--port N] [--workers N] [--cache DIR]")
+        print("       python annotation_daemon.py submit <input.docx> <output.docx> <spec.json> [--port N]")
+        print("       python annotation_daemon.py list <input.docx> [--port N]")
+        print("       python annotation_daemon.py stats [--port N]")
+        sys.exit(1)
+
+    command = args[0]
+
+    if command == 'serve':
+        workers = int(args[args.index('--workers') + 1]) if '--workers' in args else 2
+        cache_dir = args[args.index('--cache') + 1] if '--cache' in args else None
+        serve(port, workers, cache_dir)
+        return
+
+    try:
+        if command == 'stats':
+            print(json.dumps(_call(port, 'GET', '/stats'), indent=2))
+
+        elif command == 'list':
+            if len(args) < 2:
+                print("Usage: python annotation_daemon.py list <input.docx>")
+                sys.exit(1)
+            job = submit_and_wait(port, {'type': 'list_comments', 'input': os.path.abspath(args[1])})
+            if job['status'] == 'failed':
+                print(f"✗ {job['error']}")
+                sys.exit(1)
+            for c in job['result']:
+                print(f"  [{c['id']}] {c['author']}: '{c['text']}'")
+            print(f"\n{len(job['result'])} comment(s) in {job['latency_ms']}ms")
+
+        else:
+            if len(args) < 4:
+                print("Usage: python annotation_daemon.py submit <input.docx> <output.docx> <spec.json>")
+                sys.exit(1)
+            with open(args[3], 'r') as f:
+                annotations = json.load(f)
+            job = submit_and_wait(port, {
+                'type': 'annotate',
+                'input': os.path.abspath(args[1]),
+                'output': os.path.abspath(args[2]),
+                'annotations': annotations,
+            })
+            if job['status'] == 'failed':
+                print(f"✗ {job['error']}")
+                sys.exit(1)
+            report = job['result']
+            cached = " (cached)" if report.get('cached') else ""
+            print(f"✓ Added {report['added']}, skipped {report['skipped']}, missing {len(report['missing'])}{cached} "
+                  f"({job['latency_ms']}ms, {job['run_ms']}ms running)")
+
+    except (RuntimeError, urlerror.URLError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -111,6 +111,63 @@ function test4_step1_findDocxAnchor() {
   }
 }
 
+/**
+ * Harvest every anchored comment in one listing (all pages) and save it as
+ * a JSON file in Drive for anchor_store.py (the log would truncate it):
+ *   python anchor_store.py import anchors.db <doc_id> harvest.json
+ */
+function harvestAnchors() {
+  const doc = DocumentApp.getActiveDocument();
+  const fileId = doc.getId();
+
+  try {
+    let harvested = [];
+    let pageToken = null;
+
+    do {
+      const page = Drive.Comments.list(fileId, {
+        fields: "nextPageToken,comments(id,content,anchor,quotedFileContent)",
+        pageSize: 100,
+        pageToken: pageToken
+      });
+
+      (page.comments || []).forEach(function(c) {
+        if (c.anchor) {
+          harvested.push({
+            id: c.id,
+            content: c.content,
+            anchor: c.anchor,
+            quotedFileContent: c.quotedFileContent || null
+          });
+        }
+      });
+
+      pageToken = page.nextPageToken;
+    } while (pageToken);
+
+    // Apps Script truncates long log output, so the JSON goes to a Drive file
+    const file = DriveApp.createFile(
+      "harvest-" + fileId + ".json",
+      JSON.stringify(harvested),
+      MimeType.PLAIN_TEXT
+    );
+
+    Logger.log("Document ID: " + fileId);
+    Logger.log("Harvest file ID: " + file.getId());
+
+    DocumentApp.getUi().alert(
+      "Harvested " + harvested.length + " anchored comment(s).\n\n" +
+      "Saved to Drive as " + file.getName() + " (ID " + file.getId() + ").\n" +
+      "Download it as harvest.json."
+    );
+
+    return harvested;
+  } catch (e) {
+    Logger.log("ERROR: " + e.toString());
+    DocumentApp.getUi().alert("Error: " + e.toString());
+  }
+}
+
 /**
  * Step 2: Delete the DOCX comment, then create a new one with same anchor
  */
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Bulk Comment Writer
+
+doc.add_comment() finds the next comment id by reading every existing
+w:comment id (max + 1), and add_comment() in test4_docx_anchor_generator.py
+walks doc.paragraphs again for every target, so adding n comments to one
+document costs O(n^2). BulkCommentWriter reads the existing ids once and then
+hands out ids from a counter, builds each w:comment by copying one prepared
+template, and appends the new elements to comments.xml in batches. Target
+lookup uses a paragraph list and run texts captured once (splitting runs
+does not change either).
+
+The XML written is the same as python-docx writes: a CommentText paragraph
+with the annotationRef run, one CommentText paragraph per line of text, and the
+commentRangeStart / commentRangeEnd / commentReference markers from
+Run.mark_comment_range.
+
+Usage:
+    python bulk_comments.py bench [--max 50000]
+
+Example:
+    python bulk_comments.py bench --max 50000
+"""
+
+import sys
+import copy
+import time
+import itertools
+from datetime import datetime, timezone
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from test4_docx_anchor_generator import split_runs_at_span
+from text_matching import find_match
+
+COMMENT_TEMPLATE = (
+    f'<w:comment {nsdecls("w")} w:id="0" w:author="">'
+    '<w:p><w:pPr><w:pStyle w:val="CommentText"/></w:pPr>'
+    '<w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r></w:p>'
+    '</w:comment>'
+)
+BATCH_SIZE = 1000
+
+
+class BulkCommentWriter:
+    """Adds many comments to one Document with O(1) work per comment."""
+
+    def __init__(self, doc: Document, batch_size: int = BATCH_SIZE):
+        self.doc = doc
+        self.comments_element = doc.comments._comments_elm
+        used = [int(i) for i in self.comments_element.xpath('./w:comment/@w:id')]
+        self.ids = itertools.count(max(used, default=-1) + 1)
+        self.template = parse_xml(COMMENT_TEMPLATE)
+        self.date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.batch_size = batch_size
+        self.pending = []
+        self._paragraphs = None
+        self._texts = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def new_comment(self, text: str, author: str, initials: str = "AG", date: str = None) -> int:
+        """Create a w:comment (not yet anchored) and return its id."""
+        comment_id = next(self.ids)
+        comment = copy.deepcopy(self.template)
+        comment.set(qn('w:id'), str(comment_id))
+        comment.set(qn('w:author'), author or "")
+        if initials is not None:
+            comment.set(qn('w:initials'), initials)
+        comment.set(qn('w:date'), date or self.date)
+
+        lines = (text or "").split("\n")
+        first = comment[0]
+        if lines[0]:
+            first.append(self._run(lines[0]))
+        for line in lines[1:]:
+            paragraph = parse_xml(f'<w:p {nsdecls("w")}><w:pPr><w:pStyle w:val="CommentText"/></w:pPr></w:p>')
+            if line:
+                paragraph.append(self._run(line))
+            comment.append(paragraph)
+
+        self.pending.append(comment)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return comment_id
+
+    @staticmethod
+    def _run(text: str):
+        run = parse_xml(f'<w:r {nsdecls("w")}><w:t/></w:r>')
+        t = run[0]
+        t.text = text
+        if text != text.strip():
+            t.set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+        return run
+
+    def add(self, runs, text: str, author: str, initials: str = "AG", date: str = None) -> int:
+        """Create a comment and anchor it on runs[0]..runs[-1]. Returns its id."""
+        comment_id = self.new_comment(text, author, initials, date)
+        runs[0].mark_comment_range(runs[-1], comment_id)
+        return comment_id
+
+    def find_span(self, target_text: str, mode: str = 'exact'):
+        """
+        Same lookup as test4_docx_anchor_generator.find_target_span: return
+        (paragraph, start, end, matched text) for the first match of
+        target_text, or None. Nothing is split.
+        """
+        if self._paragraphs is None:
+            self._paragraphs = self.doc.paragraphs
+            self._texts = [''.join(run.text for run in p.runs) for p in self._paragraphs]
+
+        for paragraph, text in zip(self._paragraphs, self._texts):
+            if mode != 'exact' or target_text in text:
+                span = find_match(text, target_text, mode)
+                if span is not None:
+                    return paragraph, span[0], span[1], text[span[0]:span[1]]
+        return None
+
+    def annotate(self, target_text: str, comment_text: str, author: str = "Anchor Generator",
+                 mode: str = 'exact'):
+        """
+        Same behaviour as test4_docx_anchor_generator.add_comment: comment the
+        first paragraph containing target_text. Returns the comment id or None.
+        """
+        found = self.find_span(target_text, mode)
+        if found is None:
+            return None
+        paragraph, start, end, _ = found
+        return self.add(split_runs_at_span(paragraph, start, end), comment_text, author)
+
+    def flush(self):
+        """Append pending comment elements to comments.xml."""
+        if self.pending:
+            self.comments_element.extend(self.pending)
+            self.pending = []
+
+
+def _bench_document(count: int) -> Document:
+    doc = Document()
+    for i in range(count):
+        doc.add_paragraph(f"Paragraph {i} with target{i} inside it.")
+    return doc
+
+
+def benchmark(sizes, baseline_limit: int = 5000):
+    """Time doc.add_comment vs BulkCommentWriter for each size; returns rows of results."""
+    rows = []
+    for n in sizes:
+        doc = _bench_document(n)
+        runs = [p.runs for p in doc.paragraphs]
+        started = time.perf_counter()
+        with BulkCommentWriter(doc) as writer:
+            for i in range(n):
+                writer.add(runs[i], f"comment {i}", "Bench")
+        bulk = time.perf_counter() - started
+
+        baseline = None
+        if n <= baseline_limit:
+            doc = _bench_document(n)
+            runs = [p.runs for p in doc.paragraphs]
+            started = time.perf_counter()
+            for i in range(n):
+                doc.add_comment(runs=runs[i], text=f"comment {i}", author="Bench", initials="AG")
+            baseline = time.perf_counter() - started
+
+        rows.append((n, baseline, bulk))
+    return rows
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] != 'bench':
+        print("Usage: python bulk_comments.py bench [--max N]")
+        sys.exit(1)
+
+    top = int(args[args.index('--max') + 1]) if '--max' in args else 50000
+    sizes = [n for n in (1000, 2500, 5000, 10000, 25000, 50000, 100000) if n <= top]
+
+    print(f"\n=== Bulk Comment Writer Benchmark ===\n")
+    print(f"{'comments':>9} {'add_comment s':>14} {'us/comment':>11} {'bulk s':>8} {'us/comment':>11}")
+    for n, baseline, bulk in benchmark(sizes):
+        base_s = f"{baseline:>14.2f} {baseline / n * 1e6:>11.1f}" if baseline is not None else f"{'(skipped)':>14} {'':>11}"
+        print(f"{n:>9} {base_s} {bulk:>8.2f} {bulk / n * 1e6:>11.1f}")
+
+    print("\n✓ Flat us/comment for the bulk writer means linear scaling")
+
+
+if __name__ == "__main__":
+    main()
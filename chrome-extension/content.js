@@ -63,109 +63,132 @@ function isUsefulText(text) {
   return cleaned.length >= 5; // At least 5 real characters
 }
 
+const EDITOR_SELECTOR = '.kix-appview-editor';
+const PARAGRAPH_SELECTOR = '.kix-paragraphrenderer';
+
+// Cached text index, dropped by the MutationObserver whenever the editor changes
+let textIndexCache = null;
+let textIndexObserver = null;
+
 /**
- * Extract the document text content
- * Google Docs renders in a canvas, but text is also in DOM for accessibility
+ * Build the document text in one TreeWalker pass over the editor.
+ *
+ * Returns { text, offsets, root, method }: offsets maps each text node to
+ * the offset of its first character in text. When paragraph renderers
+ * are present only their text is used, one paragraph per line; otherwise
+ * every text node under the editor is taken.
  */
-async function getDocumentText() {
-  const results = [];
-
-  try {
-    // Method 1: Paragraph renderers (most reliable for newer Google Docs)
-    const paragraphs = document.querySelectorAll('.kix-paragraphrenderer');
-    if (paragraphs.length > 0) {
-      let text = '';
-      paragraphs.forEach((p, i) => {
-        if (i > 0) text += '\n';
-        text += p.textContent;
-      });
-      if (isUsefulText(text)) {
-        results.push({ text, method: 'kix-paragraphrenderer', charCount: text.length });
+function buildTextIndex() {
+  const root = document.querySelector(EDITOR_SELECTOR);
+  if (!root) return null;
+
+  const paragraphMode = !!root.querySelector(PARAGRAPH_SELECTOR);
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  const parts = [];
+  const offsets = new WeakMap();
+  let length = 0;
+  let lastParagraph = null;
+  let node;
+
+  while (node = walker.nextNode()) {
+    const content = node.nodeValue;
+    if (!content) continue;
+
+    if (paragraphMode) {
+      const paragraph = node.parentElement && node.parentElement.closest(PARAGRAPH_SELECTOR);
+      if (!paragraph) continue;
+      if (paragraph !== lastParagraph) {
+        if (lastParagraph) {
+          parts.push('\n');
+          length += 1;
+        }
+        lastParagraph = paragraph;
       }
     }
 
-    // Method 2: Line view content blocks
-    const lineBlocks = document.querySelectorAll('.kix-lineview-content');
-    if (lineBlocks.length > 0) {
-      let text = '';
-      lineBlocks.forEach(el => {
-        text += el.textContent;
-      });
-      if (isUsefulText(text)) {
-        results.push({ text, method: 'kix-lineview-content', charCount: text.length });
-      }
-    }
+    offsets.set(node, length);
+    parts.push(content);
+    length += content.length;
+  }
 
-    // Method 3: Word nodes (granular text)
-    const wordNodes = document.querySelectorAll('.kix-wordhtmlgenerator-word-node');
-    if (wordNodes.length > 0) {
-      let text = '';
-      wordNodes.forEach(el => {
-        text += el.textContent;
-      });
-      if (isUsefulText(text)) {
-        results.push({ text, method: 'kix-wordhtmlgenerator', charCount: text.length });
-      }
-    }
+  return {
+    text: parts.join(''),
+    offsets,
+    root,
+    method: paragraphMode ? 'treewalker-paragraphs' : 'treewalker'
+  };
+}
 
-    // Method 4: Try the page content wrapper
-    const pageContent = document.querySelector('.kix-page-content-wrapper');
-    if (pageContent) {
-      const text = pageContent.innerText;
-      if (isUsefulText(text)) {
-        results.push({ text, method: 'page-content-wrapper', charCount: text.length });
-      }
-    }
+/**
+ * Return the cached text index, rebuilding it if the editor has changed
+ */
+function getTextIndex() {
+  if (textIndexCache && textIndexCache.root.isConnected) {
+    return { index: textIndexCache, cached: true };
+  }
 
-    // Method 5: Try all spans with specific styling (text spans)
-    const allSpans = document.querySelectorAll('.kix-lineview span[style*="font"]');
-    if (allSpans.length > 0) {
-      let text = '';
-      allSpans.forEach(el => {
-        text += el.textContent;
-      });
-      if (isUsefulText(text)) {
-        results.push({ text, method: 'styled-spans', charCount: text.length });
-      }
-    }
+  const index = buildTextIndex();
+  if (!index) return { index: null, cached: false };
 
-    // Method 6: Raw document body scan for any text-containing elements
-    const docsBody = document.querySelector('.kix-appview-editor');
-    if (docsBody) {
-      const walker = document.createTreeWalker(
-        docsBody,
-        NodeFilter.SHOW_TEXT,
-        null,
-        false
-      );
-      let text = '';
-      let node;
-      while (node = walker.nextNode()) {
-        const content = node.textContent.trim();
-        if (content && content.length > 0) {
-          text += content + ' ';
-        }
-      }
-      if (isUsefulText(text)) {
-        results.push({ text: text.trim(), method: 'treewalker', charCount: text.length });
-      }
-    }
+  if (textIndexObserver) textIndexObserver.disconnect();
+  textIndexObserver = new MutationObserver(() => {
+    textIndexCache = null;
+    textIndexObserver.disconnect();
+    textIndexObserver = null;
+  });
+  textIndexObserver.observe(index.root, { childList: true, subtree: true, characterData: true });
+
+  textIndexCache = index;
+  return { index, cached: false };
+}
+
+/**
+ * Text offset of a DOM position (text node + offset within it), or -1
+ */
+function textOffsetOf(index, node, offsetInNode = 0) {
+  if (!node || !index.offsets.has(node)) return -1;
+  return index.offsets.get(node) + offsetInNode;
+}
+
+/**
+ * Text offsets { startIndex, endIndex } of targetText, or null.
+ *
+ * When the page selection is inside the document text, the first occurrence
+ * that ends after the selection point wins, so a repeated phrase can be
+ * picked by clicking into it; otherwise the first occurrence is used.
+ */
+function findTargetRange(index, targetText) {
+  let from = 0;
+  const selection = window.getSelection();
+  if (selection && selection.rangeCount) {
+    const offset = textOffsetOf(index, selection.anchorNode, selection.anchorOffset);
+    if (offset !== -1) from = Math.max(0, offset - targetText.length + 1);
+  }
+
+  let startIndex = index.text.indexOf(targetText, from);
+  if (startIndex === -1 && from > 0) startIndex = index.text.indexOf(targetText);
+  if (startIndex === -1) return null;
+  return { startIndex, endIndex: startIndex + targetText.length };
+}
 
-    // Return the result with the most content
-    if (results.length > 0) {
-      results.sort((a, b) => b.charCount - a.charCount);
-      const best = results[0];
-      best.allMethods = results.map(r => `${r.method}(${r.charCount})`);
-      return best;
+/**
+ * Extract the document text content
+ * Google Docs renders in a canvas, but text is also in DOM for accessibility
+ */
+async function getDocumentText() {
+  try {
+    const { index, cached } = getTextIndex();
+    if (index && isUsefulText(index.text)) {
+      return { text: index.text, method: index.method, charCount: index.text.length, cached };
     }
 
     return {
       text: null,
-      error: 'Could not extract document text with any method',
+      error: 'Could not extract document text',
       debug: {
-        hasParagraphs: document.querySelectorAll('.kix-paragraphrenderer').length,
-        hasLineviews: document.querySelectorAll('.kix-lineview').length,
-        hasEditor: !!document.querySelector('.kix-appview-editor'),
+        hasParagraphs: !!document.querySelector(PARAGRAPH_SELECTOR),
+        hasLineviews: !!document.querySelector('.kix-lineview'),
+        hasEditor: !!document.querySelector(EDITOR_SELECTOR),
         hasCanvas: !!document.querySelector('.kix-canvas-tile-content')
       }
     };
@@ -250,18 +273,18 @@ async function addComment(targetText, commentText) {
   console.log('  Document ID:', docInfo.docId);
 
   // Step 2: Get document text and find target position
-  const textResult = await getDocumentText();
-  if (!textResult.text) {
-    throw new Error('Could not extract document text: ' + textResult.error);
+  const { index, cached } = getTextIndex();
+  if (!index || !isUsefulText(index.text)) {
+    throw new Error('Could not extract document text');
   }
-  console.log('  Text extraction method:', textResult.method);
-  console.log('  Text length:', textResult.text.length);
+  console.log('  Text extraction method:', index.method, cached ? '(cached)' : '');
+  console.log('  Text length:', index.text.length);
 
-  const startIndex = textResult.text.indexOf(targetText);
-  if (startIndex === -1) {
+  const range = findTargetRange(index, targetText);
+  if (!range) {
     throw new Error(`Target text "${targetText}" not found in document`);
   }
-  const endIndex = startIndex + targetText.length;
+  const { startIndex, endIndex } = range;
   console.log('  Target found at:', startIndex, '-', endIndex);
 
   // Step 3: Get session parameters
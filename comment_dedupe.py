@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Comment De-duplication
+
+Makes re-running the annotation scripts idempotent. Every existing comment is
+reduced to a fingerprint of (range text, comment text, author), and the
+fingerprints are kept in a set so checking a new comment is O(1).
+
+Usage:
+    python comment_dedupe.py input.docx
+
+Example:
+    python comment_dedupe.py test_anchored.docx
+"""
+
+import sys
+from collections import Counter
+from docx import Document
+from docx.oxml.ns import qn
+
+
+def comment_fingerprint(range_text: str, comment_text: str, author: str):
+    """Return the fingerprint identifying a comment on a piece of text."""
+    return (range_text or "", comment_text or "", author or "")
+
+
+def comment_range_texts(doc: Document):
+    """
+    Map each comment id to the text enclosed by its comment range.
+
+    Walks the body once in document order, so ranges spanning several runs or
+    paragraphs are collected without a lookup per comment.
+    """
+    range_start = qn('w:commentRangeStart')
+    range_end = qn('w:commentRangeEnd')
+    ranges = {}
+    open_ids = []
+
+    for element in doc.element.body.iter(range_start, range_end, qn('w:t')):
+        if element.tag == range_start:
+            comment_id = element.get(qn('w:id'))
+            ranges[comment_id] = []
+            open_ids.append(comment_id)
+        elif element.tag == range_end:
+            comment_id = element.get(qn('w:id'))
+            if comment_id in open_ids:
+                open_ids.remove(comment_id)
+        elif element.text:
+            for comment_id in open_ids:
+                ranges[comment_id].append(element.text)
+
+    return {comment_id: ''.join(parts) for comment_id, parts in ranges.items()}
+
+
+def existing_fingerprints(doc: Document, comments):
+    """
+    Return the set of fingerprints for the comments already in the document.
+
+    `comments` is the list returned by `list_existing_comments` or any
+    iterable of CommentRecord (see comment_model.iter_comments).
+    """
+    ranges = comment_range_texts(doc)
+    return {
+        comment_fingerprint(ranges.get(c['id'], ""), c['text'], c['author'])
+        for c in comments
+    }
+
+
+def find_duplicate_comments(doc: Document, comments):
+    """Return (fingerprint, count) pairs for comments that appear more than once."""
+    ranges = comment_range_texts(doc)
+    counts = Counter(
+        comment_fingerprint(ranges.get(c['id'], ""), c['text'], c['author'])
+        for c in comments
+    )
+    return [(fp, count) for fp, count in counts.items() if count > 1]
+
+
+def main():
+    # Imported here because test_comment_roundtrip imports this module
+    from test_comment_roundtrip import list_existing_comments
+
+    if len(sys.argv) < 2:
+        print("Usage: python comment_dedupe.py <input.docx>")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+
+    print(f"\n=== Duplicate Comment Check ===\n")
+    print(f"Input: {input_file}")
+
+    doc = Document(input_file)
+    comments = list_existing_comments(doc, verbose=False)
+    duplicates = find_duplicate_comments(doc, comments)
+
+    print(f"Comments: {len(comments)}")
+
+    if not duplicates:
+        print("\n✓ No duplicate comments found")
+        return
+
+    print(f"\n✗ Found {len(duplicates)} duplicated comment(s):\n")
+    for (range_text, comment_text, author), count in duplicates:
+        print(f"  {count}x  [{author}] '{comment_text}' on '{range_text}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Bulk Comment Removal
+
+Removes every comment matching a filter from a .docx in one rewrite: the
+w:comment entries in comments.xml, their commentRangeStart/commentRangeEnd/
+commentReference markers in document.xml and in the header, footer,
+footnote and endnote parts, and their entries in the
+commentsExtended/commentsIds/commentsExtensible parts Word adds. Replies to a
+removed comment are removed with it (and replies to those, down the whole
+thread), so no orphaned thread is left behind.
+
+Each XML part is parsed once with lxml and every other part of the package is
+copied through untouched; python-docx is not used. This is the DOCX-side
+counterpart of deleteAllComments in apps_script_comments.js, which needs one
+Drive call per comment.
+
+Filters combine with AND; at least one is required:
+    --author NAME        (repeatable) comment author is one of these
+    --since  DATE        comment date >= DATE (ISO 8601, e.g. 2025-01-01)
+    --until  DATE        comment date <  DATE
+                         (comments with a missing or unreadable date never match)
+    --ids    1,2,3       comment id is in the set
+    --match  REGEX       comment text matches REGEX (re.search)
+
+Usage:
+    python comment_filter.py input.docx output.docx [filters...] [--dry-run]
+
+Example:
+    python comment_filter.py test_anchored.docx test_clean.docx --author "Anchor Generator"
+"""
+
+import re
+import sys
+import zipfile
+import posixpath
+from datetime import datetime, timezone
+from lxml import etree
+
+from comment_model import W_NS, W_COMMENT, W_ID, RT_COMMENTS, CommentRecord
+
+# Spelled out for the same reason as in comment_model: no python-docx import
+W14_NS = 'http://schemas.microsoft.com/office/word/2010/wordml'
+W15_NS = 'http://schemas.microsoft.com/office/word/2012/wordml'
+W16CID_NS = 'http://schemas.microsoft.com/office/word/2016/wordml/cid'
+W16CEX_NS = 'http://schemas.microsoft.com/office/word/2018/wordml/cex'
+REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+RT_OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+RT_COMMENTS_EXTENDED = 'http://schemas.microsoft.com/office/2011/relationships/commentsExtended'
+RT_COMMENTS_IDS = 'http://schemas.microsoft.com/office/2016/09/relationships/commentsIds'
+RT_COMMENTS_EXTENSIBLE = 'http://schemas.microsoft.com/office/2018/08/relationships/commentsExtensible'
+# Story parts besides the main document that can hold comment markers
+RT_STORIES = tuple(
+    f'http://schemas.openxmlformats.org/officeDocument/2006/relationships/{name}'
+    for name in ('header', 'footer', 'footnotes', 'endnotes')
+)
+
+W_P = f'{{{W_NS}}}p'
+W_R = f'{{{W_NS}}}r'
+W_RPR = f'{{{W_NS}}}rPr'
+W_RANGE_START = f'{{{W_NS}}}commentRangeStart'
+W_RANGE_END = f'{{{W_NS}}}commentRangeEnd'
+W_REFERENCE = f'{{{W_NS}}}commentReference'
+PARA_ID = f'{{{W14_NS}}}paraId'
+COMMENT_EX = f'{{{W15_NS}}}commentEx'
+EX_PARA_ID = f'{{{W15_NS}}}paraId'
+EX_PARA_ID_PARENT = f'{{{W15_NS}}}paraIdParent'
+CID_COMMENT = f'{{{W16CID_NS}}}commentId'
+CID_PARA_ID = f'{{{W16CID_NS}}}paraId'
+CID_DURABLE_ID = f'{{{W16CID_NS}}}durableId'
+CEX_COMMENT = f'{{{W16CEX_NS}}}commentExtensible'
+CEX_DURABLE_ID = f'{{{W16CEX_NS}}}durableId'
+
+
+def _parse_date(value: str):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_filter(authors=None, since=None, until=None, ids=None, pattern=None):
+    """Return a predicate on CommentRecord that is true for comments to remove."""
+    authors = set(authors) if authors else None
+    ids = set(ids) if ids else None
+    since = _parse_date(since) if since else None
+    until = _parse_date(until) if until else None
+    regex = re.compile(pattern) if pattern else None
+
+    def matches(record):
+        if authors is not None and record.author not in authors:
+            return False
+        if ids is not None and record.id not in ids:
+            return False
+        if since or until:
+            try:
+                date = _parse_date(record.date)
+            except (AttributeError, ValueError):
+                return False
+            if (since and date < since) or (until and date >= until):
+                return False
+        if regex is not None and not regex.search(record.text or ""):
+            return False
+        return True
+
+    return matches
+
+
+def _part_paths(z: zipfile.ZipFile):
+    """
+    Return (main document path, {relationship type: part path}, [story part
+    paths]) from the package rels. Story parts are the headers, footers,
+    footnotes and endnotes; a document can have several of each.
+    """
+    rels = etree.fromstring(z.read('_rels/.rels'))
+    main = next(
+        r.get('Target').lstrip('/') for r in rels.iter(f'{{{REL_NS}}}Relationship')
+        if r.get('Type') == RT_OFFICE_DOCUMENT
+    )
+    folder, name = posixpath.split(main)
+    rels_path = posixpath.join(folder, '_rels', name + '.rels')
+
+    parts = {}
+    stories = []
+    if rels_path in z.namelist():
+        for r in etree.fromstring(z.read(rels_path)).iter(f'{{{REL_NS}}}Relationship'):
+            if r.get('TargetMode') != 'External':
+                target = r.get('Target')
+                path = target.lstrip('/') if target.startswith('/') \
+                    else posixpath.normpath(posixpath.join(folder, target))
+                parts[r.get('Type')] = path
+                if r.get('Type') in RT_STORIES and path in z.namelist() and path not in stories:
+                    stories.append(path)
+    return main, parts, stories
+
+
+def _remove(element):
+    element.getparent().remove(element)
+
+
+def remove_comments(input_file: str, output_file: str, predicate, dry_run: bool = False):
+    """
+    Write input_file to output_file without the comments predicate selects
+    (and their replies). Returns the list of removed CommentRecords.
+    """
+    with zipfile.ZipFile(input_file) as zin:
+        main, parts, stories = _part_paths(zin)
+        comments_path = parts.get(RT_COMMENTS)
+        if comments_path is None or comments_path not in zin.namelist():
+            if not dry_run:
+                with open(input_file, 'rb') as src, open(output_file, 'wb') as dst:
+                    dst.write(src.read())
+            return []
+
+        comments = etree.fromstring(zin.read(comments_path))
+        by_para_id = {}
+        records = {}
+        elements = {}
+        for comment in comments.iterchildren(W_COMMENT):
+            record = CommentRecord.from_element(comment)
+            records[record.id] = record
+            elements[record.id] = comment
+            para_ids = [p.get(PARA_ID) for p in comment.iterchildren(W_P) if p.get(PARA_ID)]
+            if para_ids:
+                # The thread link is keyed by the comment's last paragraph
+                by_para_id[para_ids[-1]] = record.id
+
+        removed = {comment_id for comment_id, record in records.items() if predicate(record)}
+
+        extended_path = parts.get(RT_COMMENTS_EXTENDED)
+        extended = etree.fromstring(zin.read(extended_path)) \
+            if extended_path and extended_path in zin.namelist() else None
+        if extended is not None:
+            parent_of = {
+                ex.get(EX_PARA_ID): ex.get(EX_PARA_ID_PARENT)
+                for ex in extended.iterchildren(COMMENT_EX) if ex.get(EX_PARA_ID_PARENT)
+            }
+            # Repeat until nothing changes: a reply to a reply may come first
+            while True:
+                cascade = {
+                    by_para_id[para_id] for para_id, parent_para_id in parent_of.items()
+                    if para_id in by_para_id and by_para_id.get(parent_para_id) in removed
+                }
+                if cascade <= removed:
+                    break
+                removed |= cascade
+
+        removed_records = [records[comment_id] for comment_id in records if comment_id in removed]
+        if dry_run or not removed:
+            if not dry_run:
+                with open(input_file, 'rb') as src, open(output_file, 'wb') as dst:
+                    dst.write(src.read())
+            return removed_records
+
+        removed_para_ids = set()
+        for comment_id in removed:
+            comment = elements[comment_id]
+            removed_para_ids.update(p.get(PARA_ID) for p in comment.iterchildren(W_P) if p.get(PARA_ID))
+            _remove(comment)
+
+        rewritten = {comments_path: comments}
+        for path in [main] + stories:
+            story = etree.fromstring(zin.read(path))
+            markers = [m for m in story.iter(W_RANGE_START, W_RANGE_END, W_REFERENCE) if m.get(W_ID) in removed]
+            for marker in markers:
+                parent = marker.getparent()
+                _remove(marker)
+                # A reference run holds nothing else once its marker is gone
+                if marker.tag == W_REFERENCE and parent.tag == W_R and all(c.tag == W_RPR for c in parent):
+                    _remove(parent)
+            if markers or path == main:
+                rewritten[path] = story
+
+        if extended is not None:
+            for ex in list(extended.iterchildren(COMMENT_EX)):
+                if ex.get(EX_PARA_ID) in removed_para_ids:
+                    _remove(ex)
+            rewritten[extended_path] = extended
+
+        removed_durable_ids = set()
+        ids_path = parts.get(RT_COMMENTS_IDS)
+        if ids_path and ids_path in zin.namelist():
+            comment_ids = etree.fromstring(zin.read(ids_path))
+            for entry in list(comment_ids.iterchildren(CID_COMMENT)):
+                if entry.get(CID_PARA_ID) in removed_para_ids:
+                    removed_durable_ids.add(entry.get(CID_DURABLE_ID))
+                    _remove(entry)
+            rewritten[ids_path] = comment_ids
+
+        extensible_path = parts.get(RT_COMMENTS_EXTENSIBLE)
+        if extensible_path and extensible_path in zin.namelist():
+            extensible = etree.fromstring(zin.read(extensible_path))
+            for entry in list(extensible.iterchildren(CEX_COMMENT)):
+                if entry.get(CEX_DURABLE_ID) in removed_durable_ids:
+                    _remove(entry)
+            rewritten[extensible_path] = extensible
+
+        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                if info.filename in rewritten:
+                    data = etree.tostring(rewritten[info.filename], xml_declaration=True,
+                                          encoding='UTF-8', standalone=True)
+                else:
+                    data = zin.read(info)
+                zout.writestr(info, data)
+
+    return removed_records
+
+
+def main():
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    if dry_run:
+        args.remove('--dry-run')
+
+    authors = []
+    options = {}
+    while '--author' in args:
+        i = args.index('--author')
+        authors.append(args[i + 1])
+        del args[i:i + 2]
+    for flag in ('--since', '--until', '--ids', '--match'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    if len(args) < 2 or not (authors or options):
+        print("Usage: python comment_filter.py <input.docx> <output.docx> [--author NAME ...] [--since DATE]")
+        print("       [--until DATE] [--ids 1,2,3] [--match REGEX] [--dry-run]")
+        print("\nAt least one filter is required.")
+        sys.exit(1)
+
+    input_file, output_file = args[:2]
+    ids = [i.strip() for i in options['--ids'].split(',') if i.strip()] if '--ids' in options else None
+    predicate = build_filter(authors, options.get('--since'), options.get('--until'), ids, options.get('--match'))
+
+    print(f"\n=== Bulk Comment Removal ===\n")
+    print(f"Input:  {input_file}")
+    print(f"Output: {output_file}{' (dry run)' if dry_run else ''}\n")
+
+    removed = remove_comments(input_file, output_file, predicate, dry_run)
+
+    for record in removed:
+        print(f"  - [{record.id}] {record.author} ({record.date}): '{record.text}'")
+    if dry_run:
+        print(f"\n✓ Would remove {len(removed)} comment(s)")
+    else:
+        print(f"\n✓ Removed {len(removed)} comment(s)")
+        print(f"✓ Saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Drive Comment Mirror
+
+Keeps a local SQLite copy of the Drive comments on a set of documents - id,
+anchor, author, content, quoted text, resolved/deleted state and replies - so
+dashboards and anchor lookups read locally instead of listing every comment
+from Drive again (as the inspection functions in apps_script_comments.js do).
+
+The first sync of a file pulls every page. Each later sync asks only for
+comments modified since the newest modifiedTime already mirrored
+(startModifiedTime, with includeDeleted so deletions come through too) and
+follows nextPageToken until the change set is exhausted. Every page is
+upserted in its own transaction; the file's watermark only moves once the
+whole change set is in, so an interrupted sync is simply repeated.
+
+Drive access goes through drive_client.RestDriveClient (GOOGLE_OAUTH_TOKEN);
+the demo command runs the same sync against the in-memory fake_drive.FakeDrive.
+
+Usage:
+    python comment_mirror.py sync mirror.db <file_id> [file_id ...]
+    python comment_mirror.py list mirror.db <file_id> [--all]
+    python comment_mirror.py lookup mirror.db <file_id> "comment content"
+    python comment_mirror.py status mirror.db
+    python comment_mirror.py demo mirror.db            # incremental sync against the fake Drive
+
+Example:
+    python comment_mirror.py sync mirror.db 1AbCdEf
+    python comment_mirror.py lookup mirror.db 1AbCdEf "ANCHOR GENERATOR"
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    file_id       TEXT NOT NULL,
+    comment_id    TEXT NOT NULL,
+    anchor        TEXT,
+    author        TEXT,
+    content       TEXT,
+    quoted        TEXT,
+    resolved      INTEGER NOT NULL DEFAULT 0,
+    deleted       INTEGER NOT NULL DEFAULT 0,
+    created_time  TEXT,
+    modified_time TEXT,
+    replies       TEXT,               -- JSON list of Drive replies
+    PRIMARY KEY (file_id, comment_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS comments_by_content ON comments (file_id, content);
+CREATE INDEX IF NOT EXISTS comments_by_anchor ON comments (file_id, anchor);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    file_id       TEXT PRIMARY KEY,
+    watermark     TEXT,               -- newest modifiedTime mirrored
+    synced_at     TEXT,
+    comments_seen INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+SYNC_FIELDS = ('nextPageToken,comments(id,content,anchor,quotedFileContent,author,'
+               'createdTime,modifiedTime,resolved,deleted,replies)')
+PAGE_SIZE = 100
+
+
+class CommentMirror:
+    """Local SQLite mirror of Drive comments, refreshed incrementally."""
+
+    def __init__(self, path: str = "mirror.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def watermark(self, file_id: str):
+        row = self.conn.execute("SELECT watermark FROM sync_state WHERE file_id = ?", (file_id,)).fetchone()
+        return row['watermark'] if row else None
+
+    def _upsert(self, file_id: str, comments):
+        rows = []
+        for c in comments:
+            quoted = c.get('quotedFileContent')
+            rows.append((
+                file_id,
+                c['id'],
+                c.get('anchor'),
+                (c.get('author') or {}).get('displayName'),
+                c.get('content'),
+                quoted.get('value') if quoted else None,
+                int(bool(c.get('resolved'))),
+                int(bool(c.get('deleted'))),
+                c.get('createdTime'),
+                c.get('modifiedTime'),
+                json.dumps(c.get('replies') or []),
+            ))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO comments (file_id, comment_id, anchor, author, content, quoted,"
+                " resolved, deleted, created_time, modified_time, replies)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def sync(self, client, file_id: str) -> dict:
+        """
+        Bring one file up to date through a drive_client.DriveClient.
+
+        Returns {'fetched': n, 'full': bool} - full is True for a first sync.
+        """
+        watermark = self.watermark(file_id)
+        params = {'includeDeleted': 'true'}
+        if watermark:
+            params['startModifiedTime'] = watermark
+
+        fetched = 0
+        newest = watermark
+        page = []
+        for comment in client.list_comments(file_id, fields=SYNC_FIELDS, **params):
+            page.append(comment)
+            if comment.get('modifiedTime') and (newest is None or comment['modifiedTime'] > newest):
+                newest = comment['modifiedTime']
+            if len(page) == PAGE_SIZE:
+                self._upsert(file_id, page)
+                fetched += len(page)
+                page = []
+        if page:
+            self._upsert(file_id, page)
+            fetched += len(page)
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sync_state (file_id, watermark, synced_at, comments_seen) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (file_id) DO UPDATE SET watermark = excluded.watermark,"
+                " synced_at = excluded.synced_at, comments_seen = comments_seen + excluded.comments_seen",
+                (file_id, newest, datetime.now(timezone.utc).isoformat(), fetched),
+            )
+        return {'fetched': fetched, 'full': watermark is None}
+
+    # -- local reads --
+
+    def comments(self, file_id: str, include_resolved: bool = True, include_deleted: bool = False):
+        query = "SELECT * FROM comments WHERE file_id = ?"
+        if not include_deleted:
+            query += " AND deleted = 0"
+        if not include_resolved:
+            query += " AND resolved = 0"
+        return self.conn.execute(query + " ORDER BY created_time", (file_id,)).fetchall()
+
+    def lookup(self, file_id: str, content: str):
+        """Return {'anchor', 'quoted', 'comment_id'} for a live comment with this content, or None."""
+        row = self.conn.execute(
+            "SELECT anchor, quoted, comment_id FROM comments"
+            " WHERE file_id = ? AND content = ? AND deleted = 0 ORDER BY modified_time DESC LIMIT 1",
+            (file_id, content),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def status(self):
+        return self.conn.execute(
+            "SELECT s.file_id, s.watermark, s.synced_at,"
+            " (SELECT COUNT(*) FROM comments c WHERE c.file_id = s.file_id AND c.deleted = 0) AS live,"
+            " (SELECT COUNT(*) FROM comments c WHERE c.file_id = s.file_id AND c.resolved = 1"
+            "   AND c.deleted = 0) AS resolved"
+            " FROM sync_state s ORDER BY s.file_id"
+        ).fetchall()
+
+
+def _client():
+    from drive_client import RestDriveClient
+
+    token = os.environ.get('GOOGLE_OAUTH_TOKEN')
+    if not token:
+        print("ERROR: set GOOGLE_OAUTH_TOKEN")
+        sys.exit(1)
+    return RestDriveClient(token)
+
+
+def demo(db_path: str):
+    """Seed the fake Drive, sync, change a few comments, and sync again."""
+    from drive_client import FakeDriveClient
+
+    client = FakeDriveClient()
+    client.drive.seed('demo-doc', 1000)
+
+    with CommentMirror(db_path) as mirror:
+        for step in ('initial', 'no changes', 'after edits'):
+            if step == 'after edits':
+                live = [c for c in client.drive.files['demo-doc'] if not c['deleted']]
+                client.drive.update('demo-doc', live[0]['id'], {'resolved': True})
+                client.drive.update('demo-doc', live[1]['id'], {'content': 'edited'})
+                client.drive.delete('demo-doc', live[2]['id'])
+                client.drive.create('demo-doc', {'content': 'brand new'})
+            started = time.perf_counter()
+            result = mirror.sync(client, 'demo-doc')
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"✓ {step:<12} fetched {result['fetched']:>5} comment(s) in {elapsed:6.1f}ms")
+
+        row = mirror.status()[0]
+        print(f"\n  live {row['live']}, resolved {row['resolved']}, watermark {row['watermark']}")
+
+
+def main():
+    args = sys.argv[1:]
+    include_all = '--all' in args
+    if include_all:
+        args.remove('--all')
+
+    commands = ('sync', 'list', 'lookup', 'status', 'demo')
+    if len(args) < 2 or args[0] not in commands:
+        print("Usage: python comment_mirror.py sync <mirror.db> <file_id> [file_id ...]")
+        print("       python comment_mirror.py list <mirror.db> <file_id> [--all]")
+        print("       python comment_mirror.py lookup <mirror.db> <file_id> <content>")
+        print("       python comment_mirror.py status <mirror.db>")
+        print("       python comment_mirror.py demo <mirror.db>")
+        sys.exit(1)
+
+    command, db_path = args[:2]
+
+    if command == 'demo':
+        print(f"\n=== Comment Mirror Demo (fake Drive) ===\n")
+        demo(db_path)
+        return
+
+    with CommentMirror(db_path) as mirror:
+        if command == 'sync':
+            client = _client()
+            for file_id in args[2:]:
+                result = mirror.sync(client, file_id)
+                kind = 'full' if result['full'] else 'incremental'
+                print(f"✓ {file_id}: {result['fetched']} comment(s) fetched ({kind})")
+
+        elif command == 'status':
+            for row in mirror.status():
+                print(f"  {row['file_id']}  live {row['live']}  resolved {row['resolved']}  "
+                      f"watermark {row['watermark']}  synced {row['synced_at']}")
+
+        elif command == 'lookup':
+            if len(args) < 4:
+                print("Usage: python comment_mirror.py lookup <mirror.db> <file_id> <content>")
+                sys.exit(1)
+            found = mirror.lookup(args[2], args[3])
+            if found is None:
+                print(f"✗ No mirrored comment '{args[3]}'")
+                sys.exit(1)
+            print(json.dumps(found, indent=2))
+
+        else:
+            if len(args) < 3:
+                print("Usage: python comment_mirror.py list <mirror.db> <file_id> [--all]")
+                sys.exit(1)
+            for row in mirror.comments(args[2], include_deleted=include_all):
+                state = 'deleted' if row['deleted'] else ('resolved' if row['resolved'] else 'open')
+                print(f"  [{row['comment_id']}] {row['author']} ({state}) {row['anchor'] or '-'}: '{row['content']}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Compact Comment Model
+
+A slotted record type for DOCX comments plus iterators that produce them one
+at a time, so inventory, diff and export jobs over large corpora run in
+bounded memory. Author names repeat heavily across comments, so they are
+interned and every record shares one string per author.
+
+iter_comments() reads from an already loaded Document; iter_comments_in_file()
+streams word/comments.xml straight out of the .docx without building the
+python-docx object tree at all.
+
+Usage:
+    python comment_model.py inventory a.docx [b.docx ...]
+    python comment_model.py export comments.csv a.docx [b.docx ...]
+    python comment_model.py diff old.docx new.docx
+
+Example:
+    python comment_model.py diff test_with_comment.docx test_roundtrip_output.docx
+"""
+
+import sys
+import csv
+import zipfile
+import hashlib
+from collections import Counter
+from lxml import etree
+
+# Spelled out rather than taken from docx.oxml.ns / docx.opc.constants so that
+# streaming comments out of a file does not pay for importing python-docx
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+RT_COMMENTS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/comments'
+
+W_COMMENT = f'{{{W_NS}}}comment'
+W_T = f'{{{W_NS}}}t'
+W_ID = f'{{{W_NS}}}id'
+W_AUTHOR = f'{{{W_NS}}}author'
+W_DATE = f'{{{W_NS}}}date'
+
+
+class CommentRecord:
+    """One w:comment: id, author, date and plain text."""
+
+    __slots__ = ('id', 'author', 'date', 'text')
+
+    def __init__(self, comment_id, author, date, text):
+        self.id = comment_id
+        self.author = sys.intern(author) if author else author
+        self.date = date
+        self.text = text
+
+    def __getitem__(self, key):
+        # Lets records stand in for the dicts from list_existing_comments
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"CommentRecord(id={self.id!r}, author={self.author!r}, text={self.text!r})"
+
+    @classmethod
+    def from_element(cls, comment):
+        """Build a record from a w:comment element."""
+        text = ''.join(t.text for t in comment.iter(W_T) if t.text)
+        return cls(comment.get(W_ID), comment.get(W_AUTHOR), comment.get(W_DATE), text)
+
+    def digest(self) -> bytes:
+        """Return a 16-byte digest of (author, text) used for diffing."""
+        key = f"{self.author}\x00{self.text}".encode('utf-8')
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+
+def iter_comments(doc):
+    """Yield a CommentRecord for each comment in a loaded Document."""
+    try:
+        comments_element = doc.part.part_related_by(RT_COMMENTS).element
+    except KeyError:
+        return
+
+    for comment in comments_element.iterchildren(W_COMMENT):
+        yield CommentRecord.from_element(comment)
+
+
+def iter_comments_in_file(path: str):
+    """
+    Yield a CommentRecord for each comment in a .docx file.
+
+    Parses word/comments.xml incrementally and discards each element once its
+    record is built, so memory use does not grow with the comment count.
+    """
+    with zipfile.ZipFile(path) as z:
+        if 'word/comments.xml' not in z.namelist():
+            return
+
+        with z.open('word/comments.xml') as f:
+            for _, comment in etree.iterparse(f, events=('end',), tag=W_COMMENT):
+                yield CommentRecord.from_element(comment)
+
+                comment.clear()
+                parent = comment.getparent()
+                while comment.getprevious() is not None:
+                    del parent[0]
+
+
+def comment_inventory(paths):
+    """Return (comment count, Counter of comments per author) across files."""
+    total = 0
+    authors = Counter()
+    for path in paths:
+        for record in iter_comments_in_file(path):
+            total += 1
+            authors[record.author] += 1
+    return total, authors
+
+
+def diff_comments(old_path: str, new_path: str):
+    """
+    Yield ('added' | 'removed', record) pairs between two files.
+
+    Only 16-byte digests of the old and new comments are held in memory.
+    """
+    old = Counter(record.digest() for record in iter_comments_in_file(old_path))
+    new = Counter(record.digest() for record in iter_comments_in_file(new_path))
+
+    for change, path, extra in (('added', new_path, new - old), ('removed', old_path, old - new)):
+        for record in iter_comments_in_file(path):
+            digest = record.digest()
+            if extra[digest] > 0:
+                extra[digest] -= 1
+                yield change, record
+
+
+def export_comments_csv(paths, output_file: str):
+    """Stream every comment of every file to a CSV. Returns the row count."""
+    rows = 0
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'id', 'author', 'date', 'text'])
+        for path in paths:
+            for record in iter_comments_in_file(path):
+                writer.writerow([path, record.id, record.author, record.date, record.text])
+                rows += 1
+    return rows
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('inventory', 'export', 'diff'):
+        print("Usage: python comment_model.py inventory <a.docx> [b.docx ...]")
+        print("       python comment_model.py export <comments.csv> <a.docx> [b.docx ...]")
+        print("       python comment_model.py diff <old.docx> <new.docx>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == 'inventory':
+        total, authors = comment_inventory(sys.argv[2:])
+        print(f"\n=== Comment Inventory ===\n")
+        print(f"Files:    {len(sys.argv) - 2}")
+        print(f"Comments: {total}\n")
+        for author, count in authors.most_common():
+            print(f"  {count:>8}  {author}")
+
+    elif command == 'export':
+        if len(sys.argv) < 4:
+            print("Usage: python comment_model.py export <comments.csv> <a.docx> [b.docx ...]")
+            sys.exit(1)
+        rows = export_comments_csv(sys.argv[3:], sys.argv[2])
+        print(f"✓ Exported {rows} comment(s) to {sys.argv[2]}")
+
+    else:
+        if len(sys.argv) < 4:
+            print("Usage: python comment_model.py diff <old.docx> <new.docx>")
+            sys.exit(1)
+        print(f"\n=== Comment Diff ===\n")
+        changes = 0
+        for change, record in diff_comments(sys.argv[2], sys.argv[3]):
+            marker = '+' if change == 'added' else '-'
+            print(f"  {marker} [{record.id}] {record.author}: '{record.text}'")
+            changes += 1
+        if not changes:
+            print("  No differences")
+
+
+if __name__ == "__main__":
+    main()
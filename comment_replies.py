@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Threaded Comment Replies
+
+Adds replies to existing comments in a .docx and lists comments as threads.
+
+In OOXML a reply is an ordinary w:comment whose range sits alongside the
+parent's; the thread link lives in word/commentsExtended.xml, where each
+w15:commentEx ties the w14:paraId of the reply's last paragraph to the
+parent's via w15:paraIdParent. A whole batch of replies is written in one
+pass over comments.xml and the document is saved once.
+
+Usage:
+    python comment_replies.py input.docx                                  # list threads
+    python comment_replies.py input.docx output.docx <parent_id> "reply text"
+    python comment_replies.py input.docx output.docx --replies replies.json
+
+replies.json is a list of {"parent": "<comment id>", "text": "...", "author": "..."}.
+
+Example:
+    python comment_replies.py test_anchored.docx test_replies.docx 0 "Agreed, fixing this"
+"""
+
+import sys
+import json
+import random
+from datetime import datetime, timezone
+from lxml import etree
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.opc.packuri import PackURI
+from docx.opc.part import XmlPart
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from test_comment_roundtrip import list_existing_comments
+
+W14_NS = 'http://schemas.microsoft.com/office/word/2010/wordml'
+W15_NS = 'http://schemas.microsoft.com/office/word/2012/wordml'
+RT_COMMENTS_EXTENDED = 'http://schemas.microsoft.com/office/2011/relationships/commentsExtended'
+CT_COMMENTS_EXTENDED = 'application/vnd.openxmlformats-officedocument.wordprocessingml.commentsExtended+xml'
+
+PARA_ID = f'{{{W14_NS}}}paraId'
+COMMENT_EX = f'{{{W15_NS}}}commentEx'
+EX_PARA_ID = f'{{{W15_NS}}}paraId'
+EX_PARA_ID_PARENT = f'{{{W15_NS}}}paraIdParent'
+EX_DONE = f'{{{W15_NS}}}done'
+
+# Parts whose paragraphs carry w14:paraId; ids must be unique across all of them
+STORY_PARTS = ('document', 'header', 'footer', 'footnotes', 'endnotes', 'comments')
+_all_para_ids = etree.XPath('//@w14:paraId', namespaces={'w14': W14_NS})
+
+
+def _comments_element(doc: Document):
+    """Return the w:comments element, or None if the document has no comments part."""
+    try:
+        return doc.part.part_related_by(RT.COMMENTS).element
+    except KeyError:
+        return None
+
+
+class CommentsExtended:
+    """Read/write access to word/commentsExtended.xml, created on demand."""
+
+    def __init__(self, doc: Document, create: bool = False):
+        self.part = None
+        self.element = None
+
+        try:
+            self.part = doc.part.part_related_by(RT_COMMENTS_EXTENDED)
+        except KeyError:
+            if create:
+                self.element = parse_xml(f'<w15:commentsEx xmlns:w15="{W15_NS}"/>')
+                self.part = XmlPart(
+                    PackURI('/word/commentsExtended.xml'),
+                    CT_COMMENTS_EXTENDED,
+                    self.element,
+                    doc.part.package,
+                )
+                doc.part.relate_to(self.part, RT_COMMENTS_EXTENDED)
+            return
+
+        # python-docx has no part class for this, so it is loaded as a plain blob
+        self.element = self.part.element if isinstance(self.part, XmlPart) else parse_xml(self.part.blob)
+
+    def parents(self):
+        """Map reply paraId -> parent paraId."""
+        if self.element is None:
+            return {}
+        return {
+            ex.get(EX_PARA_ID): ex.get(EX_PARA_ID_PARENT)
+            for ex in self.element.iter(COMMENT_EX)
+            if ex.get(EX_PARA_ID_PARENT)
+        }
+
+    def done(self):
+        """Return the set of paraIds marked as resolved."""
+        if self.element is None:
+            return set()
+        return {ex.get(EX_PARA_ID) for ex in self.element.iter(COMMENT_EX) if ex.get(EX_DONE) == '1'}
+
+    def add(self, para_id: str, parent_para_id: str = None):
+        """Append a w15:commentEx entry."""
+        ex = self.element.makeelement(COMMENT_EX, {EX_PARA_ID: para_id})
+        if parent_para_id:
+            ex.set(EX_PARA_ID_PARENT, parent_para_id)
+        ex.set(EX_DONE, '0')
+        self.element.append(ex)
+
+    def flush(self):
+        """Write changes back when the part was loaded as a blob."""
+        if self.part is not None and not isinstance(self.part, XmlPart):
+            self.part._blob = serialize_part_xml(self.element)
+
+
+def _new_para_id(used: set) -> str:
+    """Return an unused w14:paraId (8 hex digits, below 0x80000000)."""
+    while True:
+        para_id = '%08X' % random.randint(1, 0x7FFFFFFF)
+        if para_id not in used:
+            used.add(para_id)
+            return para_id
+
+
+def _used_para_ids(doc: Document) -> set:
+    """Collect every w14:paraId in the document body, headers, footers, notes and comments."""
+    used = set()
+    for part in doc.part.package.iter_parts():
+        name = part.partname.filename
+        if not name.endswith('.xml') or not name.startswith(STORY_PARTS):
+            continue
+        # Footnotes and endnotes are loaded as plain parts, so parse their blob
+        element = part.element if isinstance(part, XmlPart) else etree.fromstring(part.blob)
+        used.update(str(para_id) for para_id in _all_para_ids(element))
+    return used
+
+
+def _reference_run(comment_id: str):
+    """Create the run holding a w:commentReference for comment_id."""
+    return parse_xml(
+        f'<w:r {nsdecls("w")}>'
+        f'<w:rPr><w:rStyle w:val="CommentReference"/></w:rPr>'
+        f'<w:commentReference w:id="{comment_id}"/>'
+        f'</w:r>'
+    )
+
+
+def _new_comment(comment_id: str, text: str, author: str, initials: str, date: str, para_id: str):
+    """Build a single-paragraph w:comment element."""
+    comment = parse_xml(
+        f'<w:comment {nsdecls("w", "w14")} w:id="{comment_id}" w:author="" w:date="{date}">'
+        f'<w:p w14:paraId="{para_id}" w14:textId="77777777">'
+        f'<w:pPr><w:pStyle w:val="CommentText"/></w:pPr>'
+        f'<w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>'
+        f'<w:r><w:t xml:space="preserve"></w:t></w:r>'
+        f'</w:p>'
+        f'</w:comment>'
+    )
+    # Set through lxml so author/text are escaped properly
+    comment.set(qn('w:author'), author)
+    comment.set(qn('w:initials'), initials)
+    comment.findall('.//' + qn('w:t'))[-1].text = text
+    return comment
+
+
+def _thread_root(comment, parents):
+    """Return the paraId of the top-level comment of comment's thread."""
+    paragraphs = comment.findall(qn('w:p'))
+    para_id = paragraphs[-1].get(PARA_ID) if paragraphs else None
+    seen = set()
+    while para_id in parents and para_id not in seen:
+        seen.add(para_id)
+        para_id = parents[para_id]
+    return para_id
+
+
+def add_replies(doc: Document, replies, author: str = "Reply Bot"):
+    """
+    Add a batch of replies in one pass.
+
+    `replies` is an iterable of (parent_id, text) or (parent_id, text, author)
+    tuples. Returns the list of (parent_id, text) whose parent was not found.
+    """
+    comments_element = _comments_element(doc)
+    if comments_element is None:
+        return [(r[0], r[1]) for r in replies]
+
+    comments = {c.get(qn('w:id')): c for c in comments_element.findall(qn('w:comment'))}
+    used_para_ids = _used_para_ids(doc)
+    next_id = max((int(cid) for cid in comments if cid and cid.isdigit()), default=-1) + 1
+
+    # Locate the parents' range markers and reference runs in one walk of the body
+    starts, ends, references = {}, {}, {}
+    for el in doc.element.body.iter(qn('w:commentRangeStart'), qn('w:commentRangeEnd'), qn('w:commentReference')):
+        cid = el.get(qn('w:id'))
+        if el.tag == qn('w:commentRangeStart'):
+            starts[cid] = el
+        elif el.tag == qn('w:commentRangeEnd'):
+            ends[cid] = el
+        else:
+            references[cid] = el.getparent()
+
+    extended = CommentsExtended(doc, create=True)
+    parents = extended.parents()
+    para_to_id = {}
+    for cid, comment in comments.items():
+        paragraphs = comment.findall(qn('w:p'))
+        if paragraphs and paragraphs[-1].get(PARA_ID):
+            para_to_id[paragraphs[-1].get(PARA_ID)] = cid
+
+    date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    missing = []
+
+    for reply in replies:
+        parent_id, text = str(reply[0]), reply[1]
+        reply_author = reply[2] if len(reply) > 2 and reply[2] else author
+
+        # Threads are flat: a reply to a reply joins the top-level comment's thread
+        parent = comments.get(parent_id)
+        if parent is not None:
+            parent_id = para_to_id.get(_thread_root(parent, parents), parent_id)
+            parent = comments[parent_id]
+
+        # A parent without a paragraph has no paraId for the thread link to point at
+        if parent is None or parent_id not in references or parent.find(qn('w:p')) is None:
+            missing.append((parent_id, text))
+            continue
+
+        # The thread link points at the parent's last paragraph
+        parent_p = parent.findall(qn('w:p'))[-1]
+        parent_para_id = parent_p.get(PARA_ID)
+        if not parent_para_id:
+            parent_para_id = _new_para_id(used_para_ids)
+            parent_p.set(PARA_ID, parent_para_id)
+            extended.add(parent_para_id)
+            para_to_id[parent_para_id] = parent_id
+
+        reply_id = str(next_id)
+        next_id += 1
+        para_id = _new_para_id(used_para_ids)
+        comment = _new_comment(reply_id, text, reply_author, reply_author[:2].upper(), date, para_id)
+        comments_element.append(comment)
+        extended.add(para_id, parent_para_id)
+        comments[reply_id] = comment
+        para_to_id[para_id] = reply_id
+        parents[para_id] = parent_para_id
+
+        # Replies share the parent's range; references follow in thread order
+        if parent_id in starts:
+            start = OxmlElement('w:commentRangeStart')
+            start.set(qn('w:id'), reply_id)
+            starts[parent_id].addnext(start)
+        if parent_id in ends:
+            end = OxmlElement('w:commentRangeEnd')
+            end.set(qn('w:id'), reply_id)
+            ends[parent_id].addnext(end)
+            ends[parent_id] = end
+        reference = _reference_run(reply_id)
+        references[parent_id].addnext(reference)
+        references[parent_id] = reference
+
+    extended.flush()
+    return missing
+
+
+def list_comment_threads(doc: Document):
+    """
+    Return top-level comments, each with a 'replies' list and 'done' flag.
+
+    Comments are the dicts produced by list_existing_comments.
+    """
+    comments_element = _comments_element(doc)
+    if comments_element is None:
+        return []
+
+    comments = list_existing_comments(doc, verbose=False)
+    extended = CommentsExtended(doc)
+    parents = extended.parents()
+    done = extended.done()
+
+    by_para_id = {}
+    roots = []
+    for comment, element in zip(comments, comments_element.findall(qn('w:comment'))):
+        paragraphs = element.findall(qn('w:p'))
+        para_id = paragraphs[-1].get(PARA_ID) if paragraphs else None
+        comment['para_id'] = para_id
+        comment['done'] = para_id in done
+        comment['replies'] = []
+        roots.append(_thread_root(element, parents))
+        if para_id:
+            by_para_id[para_id] = comment
+
+    threads = []
+    for comment, root in zip(comments, roots):
+        parent = by_para_id.get(root)
+        if parent is not None and parent is not comment:
+            parent['replies'].append(comment)
+        else:
+            threads.append(comment)
+    return threads
+
+
+def load_replies(path: str):
+    """Read replies.json into (parent_id, text, author) tuples."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return [(str(r['parent']), r['text'], r.get('author')) for r in data]
+
+
+def main():
+    if len(sys.argv) == 2:
+        doc = Document(sys.argv[1])
+        threads = list_comment_threads(doc)
+        print(f"\n=== Comment Threads ({len(threads)}) ===\n")
+        for thread in threads:
+            status = " [resolved]" if thread['done'] else ""
+            print(f"  [{thread['id']}] {thread['author']}: '{thread['text']}'{status}")
+            for reply in thread['replies']:
+                print(f"      ↳ [{reply['id']}] {reply['author']}: '{reply['text']}'")
+        return
+
+    if len(sys.argv) < 5:
+        print("Usage: python comment_replies.py <input.docx>")
+        print("       python comment_replies.py <input.docx> <output.docx> <parent_id> <reply_text>")
+        print("       python comment_replies.py <input.docx> <output.docx> --replies <replies.json>")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    output_file = sys.argv[2]
+
+    if sys.argv[3] == '--replies':
+        replies = load_replies(sys.argv[4])
+    else:
+        replies = [(sys.argv[3], sys.argv[4])]
+
+    print(f"\n=== Threaded Replies ===\n")
+    print(f"Input:   {input_file}")
+    print(f"Output:  {output_file}")
+    print(f"Replies: {len(replies)}")
+
+    doc = Document(input_file)
+    missing = add_replies(doc, replies)
+    doc.save(output_file)
+
+    print(f"\n✓ Added {len(replies) - len(missing)} reply(ies)")
+    for parent_id, text in missing:
+        print(f"✗ No comment with id {parent_id} for reply '{text}'")
+    print(f"✓ Saved: {output_file}")
+
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
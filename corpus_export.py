@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Corpus Comment Export (Arrow / Parquet)
+
+Scans many .docx files in parallel and writes one row per comment - author,
+date, text, the quoted text inside its comment range and where that range
+starts and ends (paragraph index and character offset) - to a Parquet or
+Arrow IPC file, so analysis across a corpus never has to reopen a .docx.
+
+Each worker streams word/comments.xml and word/document.xml with lxml
+iterparse; python-docx is never loaded. Rows come back to the parent, which
+writes them out in record batches of --batch-size rows, so memory stays
+bounded no matter how large the corpus is.
+
+Paragraph indexes count every w:p in document.xml in order (table cells
+included) except paragraphs nested inside another one, such as text box
+content; offsets count the paragraph's own w:t text. The quoted text is the
+same text that comment_dedupe.comment_range_texts collects, text boxes
+included. Comments without a range have null positions.
+
+Requires pyarrow (pip install pyarrow).
+
+Usage:
+    python corpus_export.py output.parquet a.docx [b.docx ...] [--workers N] [--batch-size N]
+    python corpus_export.py output.arrow --from-list paths.txt
+
+Example:
+    python corpus_export.py comments.parquet test_anchored.docx test_input.docx
+"""
+
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+
+from comment_model import W_NS, W_ID, W_T, iter_comments_in_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+W_P = f'{{{W_NS}}}p'
+W_RANGE_START = f'{{{W_NS}}}commentRangeStart'
+W_RANGE_END = f'{{{W_NS}}}commentRangeEnd'
+
+COLUMNS = (
+    ('file', 'string'),
+    ('comment_id', 'string'),
+    ('author', 'string'),
+    ('date', 'string'),
+    ('text', 'string'),
+    ('quoted_text', 'string'),
+    ('start_paragraph', 'int32'),
+    ('start_offset', 'int32'),
+    ('end_paragraph', 'int32'),
+    ('end_offset', 'int32'),
+)
+DEFAULT_BATCH_SIZE = 65536
+
+
+def _drop_read(element):
+    """Detach everything iterparse has finished before element, at every level up to the root."""
+    while element.getparent() is not None:
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
+        element = parent
+
+
+def comment_positions(path: str):
+    """
+    Map comment id -> (quoted text, start para, start offset, end para, end offset).
+
+    One streaming pass over word/document.xml; each paragraph is cleared and
+    detached, along with everything before it, once read, so memory does not
+    grow with document length.
+    """
+    positions = {}
+    open_ranges = {}
+    para_index = -1
+    offset = 0
+    depth = 0
+
+    with zipfile.ZipFile(path) as z:
+        with z.open('word/document.xml') as f:
+            for event, element in etree.iterparse(
+                f, events=('start', 'end'), tag=(W_P, W_T, W_RANGE_START, W_RANGE_END)
+            ):
+                tag = element.tag
+                if tag == W_P:
+                    # Text box paragraphs sit inside a run of the enclosing paragraph
+                    if event == 'start':
+                        depth += 1
+                        if depth == 1:
+                            para_index += 1
+                            offset = 0
+                        continue
+                    depth -= 1
+                    if depth == 0:
+                        element.clear()
+                        _drop_read(element)
+                elif event == 'start':
+                    continue
+                elif tag == W_T:
+                    if element.text:
+                        for parts in open_ranges.values():
+                            parts[2].append(element.text)
+                        if depth == 1:
+                            offset += len(element.text)
+                elif tag == W_RANGE_START:
+                    open_ranges[element.get(W_ID)] = (para_index, offset, [])
+                else:
+                    comment_id = element.get(W_ID)
+                    if comment_id in open_ranges:
+                        start_para, start_offset, parts = open_ranges.pop(comment_id)
+                        positions[comment_id] = (''.join(parts), start_para, start_offset, para_index, offset)
+
+    return positions
+
+
+def scan_file(path: str):
+    """Return (path, rows, error) for one .docx; rows are tuples in COLUMNS order."""
+    try:
+        positions = comment_positions(path)
+        rows = []
+        for record in iter_comments_in_file(path):
+            anchor = positions.get(record.id, (None, None, None, None, None))
+            rows.append((path, record.id, record.author, record.date, record.text) + anchor)
+        return path, rows, None
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+
+def arrow_schema():
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in COLUMNS])
+
+
+class BatchWriter:
+    """Buffers rows and writes them as record batches to Parquet or Arrow IPC."""
+
+    def __init__(self, output_file: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.schema = arrow_schema()
+        self.batch_size = batch_size
+        self.buffer = []
+        self.rows = 0
+        self.batches = 0
+        if output_file.endswith(('.arrow', '.feather', '.ipc')):
+            self.sink = pa.OSFile(output_file, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+            self.write_batch = self.writer.write_batch
+        else:
+            self.sink = None
+            self.writer = pq.ParquetWriter(output_file, self.schema, compression='zstd')
+            self.write_batch = lambda batch: self.writer.write_table(pa.Table.from_batches([batch]))
+
+    def add(self, rows):
+        self.buffer.extend(rows)
+        while len(self.buffer) >= self.batch_size:
+            self._flush(self.buffer[:self.batch_size])
+            del self.buffer[:self.batch_size]
+
+    def _flush(self, rows):
+        columns = list(zip(*rows))
+        arrays = [pa.array(columns[i], type=field.type) for i, field in enumerate(self.schema)]
+        self.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.rows += len(rows)
+        self.batches += 1
+
+    def close(self):
+        if self.buffer:
+            self._flush(self.buffer)
+            self.buffer = []
+        self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+
+
+def export_corpus(paths, output_file: str, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Scan paths in worker processes and write every comment to output_file.
+
+    Returns (rows written, batches written, [(path, error), ...]).
+    """
+    writer = BatchWriter(output_file, batch_size)
+    errors = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, rows, error in pool.map(scan_file, paths, chunksize=16):
+                if error:
+                    errors.append((path, error))
+                writer.add(rows)
+    finally:
+        writer.close()
+    return writer.rows, writer.batches, errors
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    batch_size = DEFAULT_BATCH_SIZE
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    if '--batch-size' in args:
+        i = args.index('--batch-size')
+        batch_size = int(args[i + 1])
+        del args[i:i + 2]
+    if '--from-list' in args:
+        i = args.index('--from-list')
+        with open(args[i + 1], 'r') as f:
+            listed = [line.strip() for line in f if line.strip()]
+        del args[i:i + 2]
+        args.extend(listed)
+
+    if len(args) < 2:
+        print("Usage: python corpus_export.py <output.parquet|output.arrow> <a.docx> [b.docx ...]")
+        print("       [--from-list paths.txt] [--workers N] [--batch-size N]")
+        sys.exit(1)
+
+    if pa is None:
+        print("ERROR: pyarrow is not installed (pip install pyarrow)")
+        sys.exit(1)
+
+    output_file, paths = args[0], args[1:]
+
+    print(f"\n=== Corpus Comment Export ===\n")
+    print(f"Files:   {len(paths)}")
+    print(f"Output:  {output_file}")
+    print(f"Workers: {workers or os.cpu_count()}")
+
+    started = time.perf_counter()
+    rows, batches, errors = export_corpus(paths, output_file, workers, batch_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n✓ Wrote {rows} comment row(s) in {batches} batch(es) in {elapsed:.2f}s")
+    for path, error in errors:
+        print(f"✗ {path}: {error}")
+
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Drive Anchor Harvester
+
+Collects the kix anchors of comments from many documents via the Drive v3
+comments API. Unlike listAllComments() / test4_step1_findDocxAnchor() it
+follows nextPageToken to the last page, asks only for the fields it needs
+(id, anchor, quotedFileContent, content) at the maximum page size, and
+fetches several documents concurrently. Each page is appended to a JSON
+Lines file as soon as it arrives.
+
+Output lines look like:
+    {"doc_id": "...", "id": "...", "content": "...", "anchor": "kix....", "quotedFileContent": {...}}
+
+Usage:
+    python drive_anchor_harvester.py output.jsonl <doc_id> [doc_id ...] [--workers N] [--store anchors.db]
+    python drive_anchor_harvester.py output.jsonl --fake
+
+The OAuth access token is read from GOOGLE_OAUTH_TOKEN. --fake runs against
+a local fake Drive (fake_drive.py) seeded with sample comments.
+
+Example:
+    GOOGLE_OAUTH_TOKEN=ya29... python drive_anchor_harvester.py harvest.jsonl 1AbCdEf 1GhIjKl --store anchors.db
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+
+DRIVE_API = 'https://www.googleapis.com/drive/v3'
+HARVEST_FIELDS = 'nextPageToken,comments(id,anchor,quotedFileContent,content)'
+PAGE_SIZE = 100
+
+
+def iter_comment_pages(session, base_url: str, doc_id: str, token: str = None,
+                       fields: str = HARVEST_FIELDS, extra_params: dict = None):
+    """Yield each page (list of comments) of a document, following nextPageToken."""
+    url = f"{base_url}/files/{doc_id}/comments"
+    headers = {'Authorization': f"Bearer {token}"} if token else {}
+    params = {'fields': fields, 'pageSize': PAGE_SIZE}
+    params.update(extra_params or {})
+
+    while True:
+        response = session.get(url, params=params, headers=headers, timeout=30)
+        response.raise_for_status()
+        page = response.json()
+        yield page.get('comments', [])
+
+        next_token = page.get('nextPageToken')
+        if not next_token:
+            return
+        params['pageToken'] = next_token
+
+
+def harvest(doc_ids, output_file: str, base_url: str = DRIVE_API, token: str = None, workers: int = 4):
+    """
+    Harvest anchored comments from every document into output_file (JSONL).
+
+    Returns {doc_id: anchored comment count}; documents that failed map to
+    the exception instead.
+    """
+    write_lock = threading.Lock()
+    local = threading.local()
+    results = {}
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def harvest_one(doc_id, out):
+        count = 0
+        for comments in iter_comment_pages(session(), base_url, doc_id, token):
+            lines = [
+                json.dumps({'doc_id': doc_id, **c}) + '\n'
+                for c in comments if c.get('anchor')
+            ]
+            with write_lock:
+                out.writelines(lines)
+                out.flush()
+            count += len(lines)
+        return count
+
+    with open(output_file, 'w') as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(harvest_one, doc_id, out): doc_id for doc_id in doc_ids}
+        for future in as_completed(futures):
+            doc_id = futures[future]
+            try:
+                results[doc_id] = future.result()
+            except Exception as e:
+                results[doc_id] = e
+
+    return results
+
+
+def load_into_store(harvest_file: str, store_path: str) -> int:
+    """Load a harvest JSONL file into an AnchorStore, one transaction per document."""
+    from anchor_store import AnchorStore
+
+    by_doc = {}
+    with open(harvest_file, 'r') as f:
+        for line in f:
+            comment = json.loads(line)
+            by_doc.setdefault(comment.pop('doc_id'), []).append(comment)
+
+    with AnchorStore(store_path) as store:
+        return sum(store.add_many(doc_id, comments) for doc_id, comments in by_doc.items())
+
+
+def main():
+    args = sys.argv[1:]
+    workers = 4
+    store_path = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    if '--store' in args:
+        i = args.index('--store')
+        store_path = args[i + 1]
+        del args[i:i + 2]
+
+    if len(args) < 2:
+        print("Usage: python drive_anchor_harvester.py <output.jsonl> <doc_id> [doc_id ...] [--workers N] [--store anchors.db]")
+        print("       python drive_anchor_harvester.py <output.jsonl> --fake")
+        sys.exit(1)
+
+    output_file = args[0]
+    server = None
+
+    if args[1] == '--fake':
+        from fake_drive import FakeDrive, start_fake_drive
+        drive = FakeDrive()
+        for i in range(4):
+            drive.seed(f"doc{i}", 250)
+        server, base_url = start_fake_drive(drive)
+        doc_ids = list(drive.files)
+        token = None
+    else:
+        base_url = DRIVE_API
+        doc_ids = args[1:]
+        token = os.environ.get('GOOGLE_OAUTH_TOKEN')
+        if not token:
+            print("ERROR: set GOOGLE_OAUTH_TOKEN to an OAuth access token with Drive scope")
+            sys.exit(1)
+
+    print(f"\n=== Drive Anchor Harvester ===\n")
+    print(f"Documents: {len(doc_ids)}")
+    print(f"Workers:   {workers}")
+    print(f"Output:    {output_file}")
+
+    started = time.time()
+    results = harvest(doc_ids, output_file, base_url, token, workers)
+    elapsed = time.time() - started
+
+    failed = 0
+    print()
+    for doc_id in doc_ids:
+        result = results[doc_id]
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"  ✗ {doc_id}: {result}")
+        else:
+            print(f"  ✓ {doc_id}: {result} anchored comment(s)")
+
+    total = sum(r for r in results.values() if not isinstance(r, Exception))
+    print(f"\n✓ Harvested {total} anchor(s) in {elapsed:.2f}s")
+    if server is not None:
+        print(f"  Fake Drive requests: {server.drive.requests}")
+        server.shutdown()
+
+    if store_path:
+        stored = load_into_store(output_file, store_path)
+        print(f"✓ Stored {stored} anchor(s) in {store_path}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Drive Client
+
+The handful of Drive operations the DOCX -> anchor -> account-linked comment
+workflow needs, behind one interface:
+
+    upload_docx(path, name)            -> file id (converted to a Google Doc)
+    list_comments(file_id)             -> iterator of comment dicts (all pages)
+    delete_comment(file_id, comment_id) -> False if it was already gone
+    create_comment(file_id, content, anchor, quoted_file_content) -> comment dict
+
+RestDriveClient talks to the Drive v3 REST API with an OAuth token.
+FakeDriveClient keeps everything in memory (fake_drive.FakeDrive) and mimics
+the Google import by giving every comment in an uploaded .docx a generated
+kix anchor and its quoted range text, so the pipeline runs offline.
+"""
+
+import abc
+import json
+import uuid
+import random
+import string
+import requests
+from docx import Document
+
+from comment_dedupe import comment_range_texts
+from comment_model import iter_comments
+from drive_anchor_harvester import DRIVE_API, iter_comment_pages
+from fake_drive import FakeDrive
+
+UPLOAD_API = 'https://www.googleapis.com/upload/drive/v3'
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+GDOC_MIME = 'application/vnd.google-apps.document'
+COMMENT_FIELDS = 'nextPageToken,comments(id,content,anchor,quotedFileContent,author,modifiedTime,resolved,deleted,replies)'
+
+
+class DriveClient(abc.ABC):
+    """Interface for the Drive operations used by the hybrid workflow."""
+
+    @abc.abstractmethod
+    def upload_docx(self, path: str, name: str) -> str:
+        ...
+
+    @abc.abstractmethod
+    def list_comments(self, file_id: str, fields: str = COMMENT_FIELDS, **params):
+        ...
+
+    @abc.abstractmethod
+    def delete_comment(self, file_id: str, comment_id: str) -> bool:
+        """Delete a comment. Returns False if it was already deleted, so retries are safe."""
+
+    @abc.abstractmethod
+    def create_comment(self, file_id: str, content: str, anchor: str = None, quoted_file_content: dict = None):
+        ...
+
+
+class RestDriveClient(DriveClient):
+    """Drive v3 over HTTPS. Not thread-safe; use one instance per thread."""
+
+    def __init__(self, token: str, base_url: str = DRIVE_API, upload_url: str = UPLOAD_API):
+        self.token = token
+        self.base_url = base_url
+        self.upload_url = upload_url
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Bearer {token}"
+
+    def upload_docx(self, path: str, name: str) -> str:
+        boundary = uuid.uuid4().hex
+        metadata = json.dumps({'name': name, 'mimeType': GDOC_MIME})
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        body = (
+            f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{metadata}\r\n"
+            f"--{boundary}\r\nContent-Type: {DOCX_MIME}\r\n\r\n"
+        ).encode('utf-8') + content + f"\r\n--{boundary}--\r\n".encode('utf-8')
+
+        response = self.session.post(
+            f"{self.upload_url}/files",
+            params={'uploadType': 'multipart', 'fields': 'id'},
+            data=body,
+            headers={'Content-Type': f"multipart/related; boundary={boundary}"},
+            timeout=120,
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def list_comments(self, file_id: str, fields: str = COMMENT_FIELDS, **params):
+        for page in iter_comment_pages(self.session, self.base_url, file_id, fields=fields, extra_params=params):
+            yield from page
+
+    def delete_comment(self, file_id: str, comment_id: str) -> bool:
+        response = self.session.delete(f"{self.base_url}/files/{file_id}/comments/{comment_id}", timeout=30)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    def create_comment(self, file_id: str, content: str, anchor: str = None, quoted_file_content: dict = None):
+        body = {'content': content}
+        if anchor:
+            body['anchor'] = anchor
+        if quoted_file_content:
+            body['quotedFileContent'] = quoted_file_content
+        response = self.session.post(
+            f"{self.base_url}/files/{file_id}/comments",
+            params={'fields': 'id,content,anchor,quotedFileContent,author'},
+            json=body,
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class FakeDriveClient(DriveClient):
+    """In-memory Drive; thread-safe, so one instance can be shared."""
+
+    def __init__(self, drive: FakeDrive = None):
+        self.drive = drive or FakeDrive()
+
+    def upload_docx(self, path: str, name: str) -> str:
+        file_id = ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(33))
+        doc = Document(path)
+        ranges = comment_range_texts(doc)
+        for record in iter_comments(doc):
+            quoted = ranges.get(record.id)
+            self.drive.create(file_id, {
+                'content': record.text,
+                'author': record.author,
+                'anchor': f"kix.{''.join(random.choice(string.ascii_lowercase + string.digits) for _ in range(12))}"
+                          if quoted else None,
+                'quotedFileContent': {'mimeType': 'text/html', 'value': quoted} if quoted else None,
+            })
+        self.drive.files.setdefault(file_id, [])
+        return file_id
+
+    def list_comments(self, file_id: str, fields: str = COMMENT_FIELDS, **params):
+        page_token = None
+        while True:
+            page = self.drive.list(
+                file_id,
+                page_size=100,
+                page_token=page_token,
+                start_modified_time=params.get('startModifiedTime'),
+                include_deleted=params.get('includeDeleted') in (True, 'true'),
+            )
+            yield from page['comments']
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+
+    def delete_comment(self, file_id: str, comment_id: str) -> bool:
+        return self.drive.delete(file_id, comment_id)
+
+    def create_comment(self, file_id: str, content: str, anchor: str = None, quoted_file_content: dict = None):
+        return self.drive.create(file_id, {
+            'content': content,
+            'anchor': anchor,
+            'quotedFileContent': quoted_file_content,
+        })
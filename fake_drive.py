@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Fake Drive Comments Endpoint
+
+A local stand-in for the Drive v3 comments API so the harvesting and sync
+tools can be exercised without a Google account. Serves
+
+    GET    /drive/v3/files/<fileId>/comments            (pageSize, pageToken, fields,
+                                                         startModifiedTime, includeDeleted)
+    POST   /drive/v3/files/<fileId>/comments
+    PATCH  /drive/v3/files/<fileId>/comments/<commentId>   (content, resolved)
+    DELETE /drive/v3/files/<fileId>/comments/<commentId>
+
+from in-memory data, with the same paging (nextPageToken) and `fields`
+projection behaviour as the real service.
+
+Usage:
+    python fake_drive.py [port] [docs] [comments_per_doc]
+
+Example:
+    python fake_drive.py 8765 3 250
+"""
+
+import sys
+import json
+import random
+import string
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _split_top_level(spec: str):
+    """Split a fields spec on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, ''
+    for ch in spec:
+        if ch == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += ch == '('
+        depth -= ch == ')'
+        current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def project(obj: dict, spec: str):
+    """Apply a Drive `fields` spec such as 'nextPageToken,comments(id,anchor)'."""
+    if not spec or spec == '*':
+        return obj
+
+    result = {}
+    for part in _split_top_level(spec):
+        name, _, inner = part.partition('(')
+        if name not in obj:
+            continue
+        value = obj[name]
+        if inner:
+            inner = inner[:-1]
+            if isinstance(value, list):
+                value = [project(v, inner) for v in value]
+            elif isinstance(value, dict):
+                value = project(value, inner)
+        result[name] = value
+    return result
+
+
+class FakeDrive:
+    """In-memory comments keyed by file id."""
+
+    def __init__(self):
+        self.files = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def seed(self, file_id: str, count: int, anchored: bool = True):
+        """Add `count` generated comments to a file."""
+        for i in range(count):
+            self.create(file_id, {
+                'content': f"MARKER {file_id} #{i}",
+                'anchor': f"kix.{''.join(random.choice(string.ascii_lowercase + string.digits) for _ in range(12))}"
+                          if anchored else None,
+                'quotedFileContent': {'mimeType': 'text/html', 'value': f"target {i}"},
+            })
+
+    def create(self, file_id: str, body: dict) -> dict:
+        with self.lock:
+            comments = self.files.setdefault(file_id, [])
+            now = _now()
+            comment = {
+                'kind': 'drive#comment',
+                'id': ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(16)),
+                'content': body.get('content', ''),
+                'author': {'displayName': body.get('author', 'Fake User'), 'me': True},
+                'createdTime': now,
+                'modifiedTime': now,
+                'resolved': False,
+                'deleted': False,
+                'replies': [],
+            }
+            if body.get('anchor'):
+                comment['anchor'] = body['anchor']
+            if body.get('quotedFileContent'):
+                comment['quotedFileContent'] = body['quotedFileContent']
+            comments.append(comment)
+            return comment
+
+    def update(self, file_id: str, comment_id: str, changes: dict):
+        """Apply content/resolved changes and bump modifiedTime. Returns the comment or None."""
+        with self.lock:
+            for c in self.files.get(file_id, []):
+                if c['id'] == comment_id and not c['deleted']:
+                    c.update({k: v for k, v in changes.items() if k in ('content', 'resolved')})
+                    c['modifiedTime'] = _now()
+                    return dict(c)
+            return None
+
+    def delete(self, file_id: str, comment_id: str) -> bool:
+        with self.lock:
+            for c in self.files.get(file_id, []):
+                if c['id'] == comment_id and not c['deleted']:
+                    c['deleted'] = True
+                    c['modifiedTime'] = _now()
+                    return True
+            return False
+
+    def list(self, file_id: str, page_size: int = 20, page_token: str = None,
+             start_modified_time: str = None, include_deleted: bool = False) -> dict:
+        with self.lock:
+            comments = [
+                c for c in self.files.get(file_id, [])
+                if (include_deleted or not c['deleted'])
+                and (start_modified_time is None or c['modifiedTime'] >= start_modified_time)
+            ]
+            offset = int(page_token or 0)
+            page = comments[offset:offset + page_size]
+            result = {'kind': 'drive#commentList', 'comments': [dict(c) for c in page]}
+            if offset + page_size < len(comments):
+                result['nextPageToken'] = str(offset + page_size)
+            return result
+
+
+class _Handler(BaseHTTPRequestHandler):
+    drive: FakeDrive = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        # drive / v3 / files / <fileId> / comments [/ <commentId>]
+        if len(parts) < 5 or parts[:3] != ['drive', 'v3', 'files'] or parts[4] != 'comments':
+            return None, None, {}
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        return parts[3], (parts[5] if len(parts) > 5 else None), query
+
+    def do_GET(self):
+        self.drive.requests += 1
+        file_id, comment_id, query = self._route()
+        if file_id is None or comment_id is not None:
+            return self._send(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+        page_size = min(int(query.get('pageSize', 20)), 100)
+        result = self.drive.list(
+            file_id,
+            page_size=page_size,
+            page_token=query.get('pageToken'),
+            start_modified_time=query.get('startModifiedTime'),
+            include_deleted=query.get('includeDeleted') == 'true',
+        )
+        self._send(200, project(result, query.get('fields')))
+
+    def do_POST(self):
+        self.drive.requests += 1
+        file_id, _, query = self._route()
+        if file_id is None:
+            return self._send(404, {'error': {'code': 404, 'message': 'Not found'}})
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        comment = self.drive.create(file_id, body)
+        self._send(200, project(comment, query.get('fields')))
+
+    def do_PATCH(self):
+        self.drive.requests += 1
+        file_id, comment_id, query = self._route()
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        comment = self.drive.update(file_id, comment_id, body) if comment_id else None
+        if comment is None:
+            return self._send(404, {'error': {'code': 404, 'message': 'Not found'}})
+        self._send(200, project(comment, query.get('fields')))
+
+    def do_DELETE(self):
+        self.drive.requests += 1
+        file_id, comment_id, _ = self._route()
+        if file_id is None or comment_id is None or not self.drive.delete(file_id, comment_id):
+            return self._send(404, {'error': {'code': 404, 'message': 'Not found'}})
+        self._send(204)
+
+
+def start_fake_drive(drive: FakeDrive = None, port: int = 0):
+    """
+    Start the fake endpoint in a background thread.
+
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    drive = drive or FakeDrive()
+    handler = type('FakeDriveHandler', (_Handler,), {'drive': drive})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.drive = drive
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/drive/v3"
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    docs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    per_doc = int(sys.argv[3]) if len(sys.argv) > 3 else 250
+
+    drive = FakeDrive()
+    for i in range(docs):
+        drive.seed(f"doc{i}", per_doc)
+
+    server, base_url = start_fake_drive(drive, port)
+    print(f"\n=== Fake Drive ===\n")
+    print(f"Base URL: {base_url}")
+    print(f"Files:    {', '.join(drive.files)} ({per_doc} comments each)")
+    print("\nPress Ctrl+C to stop")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
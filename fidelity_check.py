@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Anchoring Fidelity Checker
+
+Batch replacement for checking screenshots one document at a time (see
+TEST_RESULTS.md). For every (annotation spec, re-exported .docx) pair it
+compares what each comment was meant to cover with the text its comment
+range actually encloses, and rolls the results up into precision/recall
+numbers, so a regression in the split/anchor path shows up as a drop in a
+number instead of a wrong highlight somebody has to notice.
+
+Per intended annotation (spec format as in annotate.py):
+    exact       a comment with that text/author encloses exactly the target
+    normalized  encloses the target up to whitespace, quotes or zero-width
+                characters (or the spec's regex/fuzzy match covers the whole range)
+    drifted     the comment exists but its range covers something else
+    missing     no such comment in the document
+Comments by the spec's authors that no annotation asked for are 'unexpected'.
+
+    precision = (exact + normalized) / (exact + normalized + drifted + unexpected)
+    recall    = (exact + normalized) / annotations
+
+Documents are read with lxml only (corpus_export.comment_positions) and
+checked in parallel worker processes.
+
+manifest.jsonl has one pair per line: {"spec": "spec.json", "docx": "exported.docx"}
+
+Usage:
+    python fidelity_check.py manifest.jsonl [--workers N] [--report report.json] [--min-recall 0.99]
+    python fidelity_check.py spec.json exported.docx
+
+Example:
+    python fidelity_check.py spec.json test_annotated.docx
+"""
+
+import os
+import sys
+import json
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+from annotate import load_spec
+from comment_model import iter_comments_in_file
+from corpus_export import comment_positions
+from text_matching import find_match, normalize_text
+
+OUTCOMES = ('exact', 'normalized', 'drifted', 'missing', 'unexpected')
+
+
+def classify(range_text: str, annotation: dict) -> str:
+    """Return 'exact', 'normalized' or 'drifted' for a range meant to cover annotation['target']."""
+    target = annotation['target']
+    if range_text == target:
+        return 'exact'
+    if normalize_text(range_text) == normalize_text(target):
+        return 'normalized'
+    if annotation['match'] != 'exact' and range_text:
+        span = find_match(range_text, target, annotation['match'])
+        if span == (0, len(range_text)):
+            return 'normalized'
+    return 'drifted'
+
+
+def check_document(pair):
+    """
+    Worker: pair is (spec path, docx path). Returns a dict with outcome
+    counts, drift details, the number of duplicate spec entries and an error
+    string (None when the pair was checked).
+
+    Identical spec entries are checked once: annotate.py adds such a comment
+    only once, so the repeats would otherwise all count as missing.
+    """
+    spec_path, docx_path = pair
+    result = {'spec': spec_path, 'docx': docx_path, 'counts': Counter(), 'problems': [], 'similarity': [],
+              'duplicates': 0, 'error': None}
+    counts = result['counts']
+    try:
+        annotations = []
+        seen = set()
+        for a in load_spec(spec_path):
+            key = (a['target'], a['comment'], a['author'], a['match'])
+            if key in seen:
+                result['duplicates'] += 1
+                continue
+            seen.add(key)
+            annotations.append(a)
+
+        positions = comment_positions(docx_path)
+        authors = {a['author'] for a in annotations}
+
+        # Comments by the spec's authors, grouped by what they say and who said it
+        actual = defaultdict(list)
+        for record in iter_comments_in_file(docx_path):
+            if record.author in authors:
+                quoted = positions[record.id][0] if record.id in positions else None
+                actual[(record.author, record.text)].append(quoted)
+
+        for a in annotations:
+            candidates = actual.get((a['author'], a['comment']))
+            if not candidates:
+                counts['missing'] += 1
+                result['problems'].append({'outcome': 'missing', 'target': a['target'], 'comment': a['comment']})
+                continue
+
+            # Prefer a candidate that lands on the target when the same comment appears twice
+            outcomes = [classify(quoted or "", a) for quoted in candidates]
+            best = min(range(len(candidates)), key=lambda i: OUTCOMES.index(outcomes[i]))
+            quoted = candidates.pop(best)
+            counts[outcomes[best]] += 1
+            if outcomes[best] == 'drifted':
+                similarity = SequenceMatcher(None, quoted or "", a['target']).ratio()
+                result['similarity'].append(similarity)
+                result['problems'].append({'outcome': 'drifted', 'target': a['target'], 'actual': quoted,
+                                           'comment': a['comment'], 'similarity': round(similarity, 3)})
+    except Exception as e:
+        # One bad document or spec must not abort the pool.map over the corpus
+        counts.clear()
+        result['problems'] = []
+        result['similarity'] = []
+        result['duplicates'] = 0
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    for (author, text), leftover in actual.items():
+        counts['unexpected'] += len(leftover)
+        for quoted in leftover:
+            result['problems'].append({'outcome': 'unexpected', 'comment': text, 'author': author, 'actual': quoted})
+
+    return result
+
+
+def fidelity_metrics(counts: Counter) -> dict:
+    correct = counts['exact'] + counts['normalized']
+    placed = correct + counts['drifted'] + counts['unexpected']
+    intended = correct + counts['drifted'] + counts['missing']
+    return {
+        'precision': correct / placed if placed else 1.0,
+        'recall': correct / intended if intended else 1.0,
+    }
+
+
+def check_corpus(pairs, workers: int = None):
+    """Check every pair in parallel. Returns (total counts, per-document results)."""
+    totals = Counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(check_document, pairs, chunksize=8):
+            totals.update(result['counts'])
+            results.append(result)
+    return totals, results
+
+
+def load_manifest(path: str):
+    with open(path, 'r') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [(entry['spec'], entry['docx']) for entry in entries]
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    report_file = None
+    min_recall = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    if '--report' in args:
+        i = args.index('--report')
+        report_file = args[i + 1]
+        del args[i:i + 2]
+    if '--min-recall' in args:
+        i = args.index('--min-recall')
+        min_recall = float(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) == 2 and args[1].endswith('.docx'):
+        pairs = [(args[0], args[1])]
+    elif len(args) == 1:
+        pairs = load_manifest(args[0])
+    else:
+        print("Usage: python fidelity_check.py <manifest.jsonl> [--workers N] [--report report.json] [--min-recall R]")
+        print("       python fidelity_check.py <spec.json> <exported.docx>")
+        sys.exit(1)
+
+    print(f"\n=== Anchoring Fidelity Check ===\n")
+    print(f"Documents: {len(pairs)}")
+    print(f"Workers:   {workers or os.cpu_count()}")
+
+    started = time.perf_counter()
+    totals, results = check_corpus(pairs, workers)
+    elapsed = time.perf_counter() - started
+    metrics = fidelity_metrics(totals)
+    similarities = [s for r in results for s in r['similarity']]
+    duplicates = sum(r['duplicates'] for r in results)
+
+    print(f"\n{'outcome':<12} {'count':>8}")
+    for outcome in OUTCOMES:
+        print(f"{outcome:<12} {totals[outcome]:>8}")
+    print(f"\nPrecision: {metrics['precision']:.4f}")
+    print(f"Recall:    {metrics['recall']:.4f}")
+    if similarities:
+        print(f"Drifted ranges resemble their target {sum(similarities) / len(similarities):.0%} on average")
+    if duplicates:
+        print(f"Duplicate spec entries: {duplicates} (identical repeats, checked once)")
+
+    errors = [r for r in results if r['error']]
+    worst = sorted(
+        (r for r in results if r['problems']),
+        key=lambda r: len(r['problems']), reverse=True,
+    )[:5]
+    for r in worst:
+        print(f"\n✗ {r['docx']}: {len(r['problems'])} problem(s)")
+        for problem in r['problems'][:3]:
+            expected = f"'{problem['target']}'" if 'target' in problem else "(not in spec)"
+            got = f"'{problem['actual']}'" if 'actual' in problem else "no comment"
+            print(f"    {problem['outcome']:<10} '{problem['comment']}' expected {expected}, got {got}")
+    for r in errors:
+        print(f"✗ {r['docx']}: {r['error']}")
+
+    print(f"\n✓ Checked {len(results) - len(errors)} document(s) in {elapsed:.2f}s")
+
+    if report_file:
+        with open(report_file, 'w') as f:
+            json.dump({
+                'totals': dict(totals),
+                'metrics': metrics,
+                'duplicates': duplicates,
+                'documents': [
+                    {'spec': r['spec'], 'docx': r['docx'], 'counts': dict(r['counts']),
+                     'problems': r['problems'], 'duplicates': r['duplicates'], 'error': r['error']}
+                    for r in results
+                ],
+            }, f, indent=2)
+        print(f"✓ Report: {report_file}")
+
+    if errors or (min_recall is not None and metrics['recall'] < min_recall):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
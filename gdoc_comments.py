@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Google Docs Comment Tools - Unified CLI
+
+One entry point for the comment scripts in this repo. Each subcommand
+imports its implementation only when it runs, so `list` never loads
+python-docx, requests or Playwright, and `--help` loads nothing at all.
+
+Subcommands:
+    anchor        test4_docx_anchor_generator.py  (DOCX anchor generator)
+    precise       test_docx_precise.py            (precise comment on a phrase)
+    roundtrip     test_comment_roundtrip.py       (comment preservation round-trip)
+    list          stream the comments out of one or more .docx files
+    internal-api  test_internal_api.py            (needs requests)
+    browser       test_browser_automation.py      (needs playwright)
+    startup-check measure cold start with -X importtime against STARTUP_BUDGET_MS
+
+Usage:
+    python gdoc_comments.py <subcommand> [args...]
+    python gdoc_comments.py startup-check [--record startup_times.jsonl]
+
+Example:
+    python gdoc_comments.py anchor test_input.docx test_anchored.docx "quick brown fox" "ANCHOR GENERATOR"
+    python gdoc_comments.py list test_anchored.docx
+"""
+
+import sys
+
+# Existing scripts keep their own argument handling; the CLI only dispatches
+SCRIPT_COMMANDS = {
+    'anchor': ('test4_docx_anchor_generator', "Add a comment to precise text (Test 4)"),
+    'precise': ('test_docx_precise', "Precise comment targeting demo (Test 1b)"),
+    'roundtrip': ('test_comment_roundtrip', "Comment preservation round-trip (Test 2)"),
+    'internal-api': ('test_internal_api', "Internal /save + /docos API attempt (Test 6)"),
+    'browser': ('test_browser_automation', "Playwright UI automation (Test 5)"),
+}
+
+# Cold-start budgets in milliseconds of import time on top of a bare interpreter
+STARTUP_BUDGET_MS = {
+    '--help': 5,
+    'list': 40,
+}
+
+# Modules a probe must not import
+STARTUP_FORBIDDEN = {
+    '--help': ('docx', 'lxml', 'requests', 'playwright'),
+    'list': ('docx', 'requests', 'playwright'),
+}
+
+
+def usage():
+    print("Usage: python gdoc_comments.py <subcommand> [args...]\n")
+    print("Subcommands:")
+    for name, (_, description) in SCRIPT_COMMANDS.items():
+        print(f"  {name:<14}{description}")
+    print(f"  {'list':<14}List comments in .docx files")
+    print(f"  {'startup-check':<14}Check cold-start import time against the budget")
+
+
+def run_script(module_name: str, args):
+    """Import a script module and run its main() with args as its argv."""
+    import importlib
+    module = importlib.import_module(module_name)
+    sys.argv = [module.__file__] + list(args)
+    module.main()
+
+
+def list_comments(args):
+    from comment_model import iter_comments_in_file
+
+    if not args:
+        print("Usage: python gdoc_comments.py list <input.docx> [more.docx ...]")
+        sys.exit(1)
+
+    for path in args:
+        count = 0
+        print(f"\n=== {path} ===")
+        for record in iter_comments_in_file(path):
+            print(f"  [{record.id}] {record.author} ({record.date}): '{record.text}'")
+            count += 1
+        if not count:
+            print("  No comments found.")
+
+
+def _import_profile(argv, baseline=frozenset()):
+    """
+    Run python -X importtime with argv; return (ms, set of imported modules).
+
+    Only top-level imports not in baseline are timed, so the interpreter's own
+    start-up (site, encodings, ...) doesn't count against the budget.
+    """
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + argv,
+        capture_output=True, text=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        modules.add(name.strip())
+        # Top-level imports are not indented; their cumulative times add up to the total
+        if not name[1:].startswith(' ') and name.strip() not in baseline:
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def startup_check(args):
+    import os
+    import json
+    import time
+
+    record_file = args[args.index('--record') + 1] if '--record' in args else None
+    here = os.path.dirname(os.path.abspath(__file__))
+    sample = os.path.join(here, 'test_anchored.docx')
+    probes = {'--help': ['--help'], 'list': ['list', sample]}
+    _, baseline = _import_profile(['-c', 'pass'])
+
+    print("\n=== Startup Check ===\n")
+    print(f"{'probe':<10} {'imports ms':>11} {'budget':>8}  result")
+
+    failed = False
+    results = {}
+    for probe, argv in probes.items():
+        total_ms, modules = _import_profile([__file__] + argv, baseline)
+        heavy = [m for m in STARTUP_FORBIDDEN[probe] if m in modules]
+        over = total_ms > STARTUP_BUDGET_MS[probe]
+        failed |= over or bool(heavy)
+        results[probe] = round(total_ms, 2)
+
+        status = "✓" if not (over or heavy) else "✗"
+        notes = []
+        if over:
+            notes.append("over budget")
+        if heavy:
+            notes.append(f"imported {', '.join(heavy)}")
+        print(f"{probe:<10} {total_ms:>11.1f} {STARTUP_BUDGET_MS[probe]:>8}  {status} {'; '.join(notes)}")
+
+    if record_file:
+        with open(record_file, 'a') as f:
+            f.write(json.dumps({'time': int(time.time()), 'import_ms': results}) + '\n')
+        print(f"\nRecorded to {record_file}")
+
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        usage()
+        return
+
+    command, args = sys.argv[1], sys.argv[2:]
+
+    if command in SCRIPT_COMMANDS:
+        run_script(SCRIPT_COMMANDS[command][0], args)
+    elif command == 'list':
+        list_comments(args)
+    elif command == 'startup-check':
+        startup_check(args)
+    else:
+        print(f"Unknown subcommand '{command}'\n")
+        usage()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+HAR Protocol Indexer
+
+Indexes the internal Google Docs traffic in a HAR capture so new command
+types can be studied without grepping the raw file. The HAR is read once;
+every /save request has its `bundles` body URL-decoded and JSON-parsed into
+one row per command, and every /docos/p/sync request has its `p` body parsed
+into one row per comment entry. Rows go into an indexed SQLite file, so
+later queries by command type, revision or document id are index lookups.
+
+Entries are streamed with ijson when it is installed; otherwise the HAR is
+loaded with json (fine for small captures, memory-bound for large ones).
+
+Usage:
+    python har_index.py build network_capture.har har_index.db
+    python har_index.py query har_index.db [--ty as] [--st doco_anchor] [--rev 123] [--doc <doc_id>] [--limit N]
+    python har_index.py summary har_index.db
+
+Example:
+    python har_index.py build network_capture.har har_index.db
+    python har_index.py query har_index.db --ty as --st doco_anchor
+"""
+
+import re
+import sys
+import json
+import sqlite3
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commands (
+    entry       INTEGER NOT NULL,   -- position of the request in the HAR
+    endpoint    TEXT NOT NULL,      -- 'save' or 'docos'
+    doc_id      TEXT,
+    rev         INTEGER,
+    ty          TEXT,               -- command type ('as', 'is', ...) or 'docos'
+    st          TEXT,               -- style/sub type ('doco_anchor', ...) or comment id
+    si          INTEGER,
+    ei          INTEGER,
+    body        TEXT NOT NULL       -- the command / entry as JSON
+);
+CREATE INDEX IF NOT EXISTS commands_ty ON commands (ty, st);
+CREATE INDEX IF NOT EXISTS commands_rev ON commands (rev);
+CREATE INDEX IF NOT EXISTS commands_doc ON commands (doc_id, rev);
+"""
+
+DOC_ID_RE = re.compile(r'/document/d/([^/?]+)')
+
+
+def iter_har_entries(har_path: str):
+    """Yield each entry of log.entries without holding the whole HAR if ijson is available."""
+    with open(har_path, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'log.entries.item', use_float=True)
+        else:
+            yield from json.load(f)['log']['entries']
+
+
+def request_doc_id(req: dict):
+    """Return the document id from the `id` query param or the URL path."""
+    for q in req.get('queryString', []):
+        if q['name'] == 'id':
+            return q['value']
+    match = DOC_ID_RE.search(req.get('url', ''))
+    return match.group(1) if match else None
+
+
+def request_form(req: dict) -> dict:
+    """Decode a form-urlencoded POST body into {name: value}."""
+    post = req.get('postData') or {}
+    if post.get('params'):
+        return {p['name']: p.get('value', '') for p in post['params']}
+    return {k: v[0] for k, v in parse_qs(post.get('text', ''), keep_blank_values=True).items()}
+
+
+def flatten_commands(commands):
+    """
+    Yield each command, followed by the commands nested in it: a multi-command
+    ({"ty": "mlti", "mts": [...]}) wraps most real edits, possibly several deep.
+    """
+    for command in commands:
+        if not isinstance(command, dict):
+            continue
+        yield command
+        if isinstance(command.get('mts'), list):
+            yield from flatten_commands(command['mts'])
+
+
+def save_commands(form: dict):
+    """Yield each command dict of a /save body's bundles, including those inside mlti commands."""
+    try:
+        bundles = json.loads(form.get('bundles', '[]'))
+    except ValueError:
+        return
+    for bundle in bundles if isinstance(bundles, list) else []:
+        if isinstance(bundle, dict):
+            yield from flatten_commands(bundle.get('commands', []))
+
+
+def sync_entries(form: dict):
+    """Yield each comment entry of a /docos/p/sync `p` body."""
+    try:
+        payload = json.loads(form.get('p', 'null'))
+    except ValueError:
+        return
+    if isinstance(payload, list) and payload and isinstance(payload[0], list):
+        for entry in payload[0]:
+            if isinstance(entry, list):
+                yield entry
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_index(har_path: str, db_path: str) -> int:
+    """Index every /save and /docos/p/sync request. Returns the number of rows."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    rows = 0
+    batch = []
+
+    def flush():
+        conn.executemany("INSERT INTO commands VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        batch.clear()
+
+    with conn:
+        conn.execute("DELETE FROM commands")
+        for index, entry in enumerate(iter_har_entries(har_path)):
+            req = entry['request']
+            if req.get('method') != 'POST':
+                continue
+
+            path = urlparse(req['url']).path
+            if path.endswith('/save'):
+                form = request_form(req)
+                doc_id = request_doc_id(req)
+                rev = _int(form.get('rev'))
+                for command in save_commands(form):
+                    batch.append((
+                        index, 'save', doc_id, rev,
+                        command.get('ty'), command.get('st'),
+                        _int(command.get('si')), _int(command.get('ei')),
+                        json.dumps(command),
+                    ))
+            elif path.endswith('/docos/p/sync'):
+                form = request_form(req)
+                doc_id = request_doc_id(req)
+                for item in sync_entries(form):
+                    batch.append((
+                        index, 'docos', doc_id, None,
+                        'docos', item[0] if item and isinstance(item[0], str) else None,
+                        None, None,
+                        json.dumps(item),
+                    ))
+
+            if len(batch) >= 1000:
+                rows += len(batch)
+                flush()
+
+        rows += len(batch)
+        flush()
+
+    conn.close()
+    return rows
+
+
+def query_index(db_path: str, ty=None, st=None, rev=None, doc_id=None, limit=50):
+    """Return matching rows as dicts, in capture order."""
+    clauses, params = [], []
+    for column, value in (('ty', ty), ('st', st), ('rev', rev), ('doc_id', doc_id)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+
+    sql = "SELECT * FROM commands"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY entry LIMIT ?"
+    params.append(limit)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def summarize_index(db_path: str):
+    """Return (endpoint, ty, st, count) for every command type seen."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT endpoint, ty, CASE WHEN endpoint = 'save' THEN st END AS st, COUNT(*) "
+            "FROM commands GROUP BY 1, 2, 3 ORDER BY 4 DESC"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ('build', 'query', 'summary'):
+        print("Usage: python har_index.py build <capture.har> <index.db>")
+        print("       python har_index.py query <index.db> [--ty T] [--st S] [--rev N] [--doc ID] [--limit N]")
+        print("       python har_index.py summary <index.db>")
+        sys.exit(1)
+
+    if args[0] == 'build':
+        if len(args) < 3:
+            print("Usage: python har_index.py build <capture.har> <index.db>")
+            sys.exit(1)
+        if ijson is None:
+            print("Note: ijson not installed - loading the whole HAR into memory")
+        rows = build_index(args[1], args[2])
+        print(f"✓ Indexed {rows} command(s) into {args[2]}")
+
+    elif args[0] == 'summary':
+        print(f"\n=== Command Types ===\n")
+        for endpoint, ty, st, count in summarize_index(args[1]):
+            print(f"  {count:>8}  {endpoint:<6} {ty or '-'} {st or ''}")
+
+    else:
+        options = dict(zip(args[2::2], args[3::2]))
+        rows = query_index(
+            args[1],
+            ty=options.get('--ty'),
+            st=options.get('--st'),
+            rev=_int(options.get('--rev')),
+            doc_id=options.get('--doc'),
+            limit=int(options.get('--limit', 50)),
+        )
+        for row in rows:
+            print(f"  #{row['entry']} {row['endpoint']} rev={row['rev']} doc={row['doc_id']}")
+            print(f"    {row['body'][:200]}")
+        print(f"\n{len(rows)} row(s)")
+
+
+if __name__ == "__main__":
+    main()
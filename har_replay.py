@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+HAR Replay Load Generator
+
+Replays the /save and /docos/p/sync traffic recorded in a HAR (the requests
+extract_session_from_har() looks at) against a local stub, to see how the
+comment client behaves at 10x-100x normal volume. Each replayed request gets
+fresh ids: kix anchors and comment ids are regenerated (consistently, so a
+/docos entry still refers to the anchor its /save created), revisions
+increase monotonically and reqId/reqid are renumbered.
+
+Requests are issued at a fixed rate by a pool of workers; latency is timed
+from each request's scheduled send time, so a backed-up stub shows up as
+latency rather than as a silently lower rate. Only loopback targets are
+accepted.
+
+Usage:
+    python har_replay.py capture.har [--requests N] [--rate R] [--concurrency C]
+                         [--target URL] [--stub-latency MS] [--stub-error-rate P]
+
+Without --target a stub is started locally.
+
+Example:
+    python har_replay.py network_capture.har --requests 5000 --rate 500 --concurrency 32
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+import requests
+
+from har_index import iter_har_entries, request_form
+from test_internal_api import generate_comment_id, generate_kix_anchor
+
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def load_sequence(har_path: str):
+    """Return the recorded /save and /docos/p/sync POSTs as (kind, path, params, form)."""
+    sequence = []
+    for entry in iter_har_entries(har_path):
+        req = entry['request']
+        if req.get('method') != 'POST':
+            continue
+        url = urlparse(req['url'])
+        if url.path.endswith('/save'):
+            kind = 'save'
+        elif url.path.endswith('/docos/p/sync'):
+            kind = 'docos'
+        else:
+            continue
+        params = {q['name']: q['value'] for q in req.get('queryString', [])}
+        if not params:
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        sequence.append((kind, url.path, params, request_form(req)))
+    return sequence
+
+
+class Rewriter:
+    """Gives each replayed request fresh anchors, comment ids and revisions."""
+
+    def __init__(self, base_rev: int = 1000):
+        self.lock = threading.Lock()
+        self.rev = base_rev
+        self.req_id = 0
+        self.anchors = {}
+        self.comment_ids = {}
+
+    def _anchor(self, old: str) -> str:
+        if old not in self.anchors:
+            self.anchors[old] = generate_kix_anchor()
+        return self.anchors[old]
+
+    def _comment_id(self, old: str) -> str:
+        if old not in self.comment_ids:
+            self.comment_ids[old] = generate_comment_id()
+        return self.comment_ids[old]
+
+    def _rewrite_value(self, value):
+        """Swap any kix anchor or known comment id inside a parsed payload."""
+        if isinstance(value, str):
+            if value.startswith('kix.'):
+                return self._anchor(value)
+            if value in self.comment_ids:
+                return self.comment_ids[value]
+            return value
+        if isinstance(value, list):
+            return [self._rewrite_value(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._rewrite_value(v) for k, v in value.items()}
+        return value
+
+    def new_round(self):
+        """Forget id mappings so the next pass over the sequence creates new objects."""
+        with self.lock:
+            self.anchors.clear()
+            self.comment_ids.clear()
+
+    def rewrite(self, kind: str, params: dict, form: dict):
+        """Return (params, form) ready to send."""
+        with self.lock:
+            params = dict(params)
+            form = dict(form)
+            self.req_id += 1
+
+            if kind == 'save':
+                self.rev += 1
+                if 'rev' in form:
+                    form['rev'] = str(self.rev)
+                try:
+                    bundles = json.loads(form.get('bundles', '[]'))
+                except ValueError:
+                    bundles = None
+                if isinstance(bundles, list):
+                    for bundle in bundles:
+                        if isinstance(bundle, dict) and 'reqId' in bundle:
+                            bundle['reqId'] = self.req_id
+                    form['bundles'] = json.dumps(self._rewrite_value(bundles))
+            else:
+                params['reqid'] = str(self.req_id)
+                try:
+                    payload = json.loads(form.get('p', 'null'))
+                except ValueError:
+                    payload = None
+                if isinstance(payload, list) and payload and isinstance(payload[0], list):
+                    for item in payload[0]:
+                        if isinstance(item, list) and item and isinstance(item[0], str):
+                            self._comment_id(item[0])
+                    form['p'] = json.dumps(self._rewrite_value(payload))
+
+            return params, form
+
+
+class Stats:
+    """Thread-safe latency / status collection."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def record(self, latency_ms: float, status):
+        with self.lock:
+            self.latencies.append(latency_ms)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status != 200:
+                self.errors += 1
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def histogram(self):
+        counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for latency in self.latencies:
+            counts[bisect_left(HISTOGRAM_BOUNDS_MS, latency)] += 1
+        return counts
+
+
+def replay(sequence, target: str, total: int, rate: float, concurrency: int):
+    """Send `total` requests cycling through the sequence. Returns (Stats, elapsed seconds)."""
+    host = urlparse(target).hostname
+    if host not in LOOPBACK_HOSTS:
+        raise ValueError(f"Refusing to replay against non-local target {target}")
+
+    rewriter = Rewriter()
+    stats = Stats()
+    counter = iter(range(total))
+    counter_lock = threading.Lock()
+    headers = {
+        'Content-Type': 'application/x-www-form-urlencoded;charset=UTF-8',
+        'X-Same-Domain': '1',
+    }
+    started = time.perf_counter()
+
+    def worker():
+        session = requests.Session()
+        while True:
+            # Rewriting under the counter lock keeps rounds from interleaving
+            # (a round's map is cleared only after its last request) and hands
+            # out revisions in send order
+            with counter_lock:
+                n = next(counter, None)
+                if n is None:
+                    return
+                kind, path, params, form = sequence[n % len(sequence)]
+                if n % len(sequence) == 0 and n:
+                    rewriter.new_round()
+                params, form = rewriter.rewrite(kind, params, form)
+
+            scheduled = started + n / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                response = session.post(target + path, params=params, data=urlencode(form),
+                                        headers=headers, timeout=30)
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            stats.record((time.perf_counter() - scheduled) * 1000, status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return stats, time.perf_counter() - started
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency_ms = 0.0
+    error_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.latency_ms:
+            time.sleep(random.expovariate(1 / self.latency_ms) / 1000)
+
+        path = urlparse(self.path).path
+        if not (path.endswith('/save') or path.endswith('/docos/p/sync')):
+            status, body = 404, b''
+        elif random.random() < self.error_rate:
+            status, body = 500, b''
+        else:
+            status, body = 200, b")]}'\n[]"
+
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub(latency_ms: float = 0.0, error_rate: float = 0.0):
+    """Start a local Docs endpoint stub. Returns (server, base_url)."""
+    handler = type('DocsStubHandler', (_StubHandler,), {'latency_ms': latency_ms, 'error_rate': error_rate})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def print_report(stats: Stats, elapsed: float):
+    count = len(stats.latencies)
+    print(f"\n=== Results ===\n")
+    print(f"Requests:   {count}")
+    print(f"Elapsed:    {elapsed:.2f}s")
+    print(f"Throughput: {count / elapsed:.1f} req/s")
+    print(f"Errors:     {stats.errors} ({100 * stats.errors / max(count, 1):.2f}%)")
+    print(f"Status:     {', '.join(f'{k}={v}' for k, v in sorted(stats.statuses.items(), key=str))}")
+    print(f"Latency:    p50={stats.percentile(50):.1f}ms  p95={stats.percentile(95):.1f}ms  "
+          f"p99={stats.percentile(99):.1f}ms  max={max(stats.latencies, default=0):.1f}ms")
+
+    print("\nLatency histogram:")
+    counts = stats.histogram()
+    peak = max(counts) or 1
+    lower = 0
+    for bound, n in zip(HISTOGRAM_BOUNDS_MS + [None], counts):
+        label = f"{lower}-{bound}ms" if bound else f">{lower}ms"
+        print(f"  {label:>12} {n:>8}  {'#' * int(40 * n / peak)}")
+        lower = bound
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print("Usage: python har_replay.py <capture.har> [--requests N] [--rate R] [--concurrency C]")
+        print("                            [--target URL] [--stub-latency MS] [--stub-error-rate P]")
+        sys.exit(1)
+
+    har_file = args[0]
+    options = dict(zip(args[1::2], args[2::2]))
+    total = int(options.get('--requests', 1000))
+    rate = float(options.get('--rate', 200))
+    concurrency = int(options.get('--concurrency', 16))
+
+    sequence = load_sequence(har_file)
+    if not sequence:
+        print("ERROR: No /save or /docos/p/sync requests found in HAR file")
+        sys.exit(1)
+
+    server = None
+    target = options.get('--target')
+    if not target:
+        server, target = start_stub(
+            float(options.get('--stub-latency', 5)),
+            float(options.get('--stub-error-rate', 0)),
+        )
+
+    print(f"\n=== HAR Replay ===\n")
+    print(f"Recorded:    {len(sequence)} request(s) "
+          f"({sum(1 for s in sequence if s[0] == 'save')} save, "
+          f"{sum(1 for s in sequence if s[0] == 'docos')} docos)")
+    print(f"Target:      {target}{' (local stub)' if server else ''}")
+    print(f"Requests:    {total} at {rate:g}/s, concurrency {concurrency}")
+
+    try:
+        stats, elapsed = replay(sequence, target, total, rate, concurrency)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_report(stats, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Test 4 Hybrid Pipeline
+
+Runs the DOCX -> kix anchor -> account-linked comment workflow for many
+documents as four pipelined stages:
+
+    generate   add a marker comment to the target text (test4_docx_anchor_generator)
+    upload     upload the .docx to Drive, converting it to a Google Doc
+    harvest    find the kix anchor Google gave the marker comment
+    recreate   delete the marker comment and create the real one on the same anchor
+
+Each stage runs in its own thread with a bounded queue in front of it, so
+document N+1 is being generated while N uploads and N-1 is harvested. Every
+finished stage is checkpointed in SQLite; a rerun with the same checkpoint
+file skips work that already completed and resumes failed jobs where they
+stopped. Per-stage counts, busy time and throughput are reported at the end.
+Each stage thread gets its own Drive client from the client factory.
+
+jobs.jsonl has one job per line:
+    {"id": "job-1", "input": "doc.docx", "target": "quick brown fox", "comment": "Please check"}
+
+Usage:
+    python hybrid_pipeline.py jobs.jsonl <workdir> [--fake] [--queue-size N]
+
+Drive access uses GOOGLE_OAUTH_TOKEN unless --fake is given, which runs the
+whole pipeline against an in-memory Drive.
+
+Example:
+    python hybrid_pipeline.py jobs.jsonl pipeline_out --fake
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import sqlite3
+import threading
+from docx import Document
+
+from drive_client import FakeDriveClient, RestDriveClient
+from fake_drive import FakeDrive
+from test4_docx_anchor_generator import add_comment
+
+STAGES = ('generate', 'upload', 'harvest', 'recreate')
+MARKER_PREFIX = 'ANCHOR GENERATOR'
+
+
+class Checkpoints:
+    """Per-(job, stage) results stored in SQLite."""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " job_id TEXT NOT NULL, stage TEXT NOT NULL, result TEXT NOT NULL,"
+            " PRIMARY KEY (job_id, stage)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def get(self, job_id: str, stage: str):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result FROM checkpoints WHERE job_id = ? AND stage = ?", (job_id, stage)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, job_id: str, stage: str, result: dict):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, stage, result) VALUES (?, ?, ?)",
+                (job_id, stage, json.dumps(result)),
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class StageStats:
+    def __init__(self):
+        self.done = 0
+        self.resumed = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+
+
+class HybridPipeline:
+    """
+    Runs jobs through STAGES with one thread and one bounded queue per stage.
+
+    drive_factory is called once per stage thread and returns that thread's
+    DriveClient (RestDriveClient is not thread-safe).
+    """
+
+    def __init__(self, drive_factory, workdir: str, checkpoints: Checkpoints, queue_size: int = 4,
+                 harvest_attempts: int = 5, harvest_delay: float = 2.0):
+        self.drive_factory = drive_factory
+        self._local = threading.local()
+        self.workdir = workdir
+        self.checkpoints = checkpoints
+        self.queue_size = queue_size
+        self.harvest_attempts = harvest_attempts
+        self.harvest_delay = harvest_delay
+        self.stats = {stage: StageStats() for stage in STAGES}
+        self.failures = []
+        self.completed = []
+
+    @property
+    def drive(self):
+        """The calling stage thread's Drive client."""
+        return self._local.drive
+
+    # -- stages: each takes the job dict and returns the fields it adds --
+
+    def generate(self, job):
+        marker = f"{MARKER_PREFIX} {job['id']}"
+        doc = Document(job['input'])
+        if not add_comment(doc, job['target'], marker):
+            raise ValueError(f"Could not find target text: '{job['target']}'")
+        path = os.path.join(self.workdir, f"{job['id']}.docx")
+        doc.save(path)
+        return {'marker': marker, 'anchored_docx': path}
+
+    def upload(self, job):
+        return {'file_id': self.drive.upload_docx(job['anchored_docx'], job['id'])}
+
+    def harvest(self, job):
+        # Conversion can lag the upload, so give the comments a moment to appear
+        for attempt in range(self.harvest_attempts):
+            for c in self.drive.list_comments(job['file_id']):
+                if c.get('content') == job['marker'] and c.get('anchor'):
+                    return {
+                        'marker_comment_id': c['id'],
+                        'anchor': c['anchor'],
+                        'quotedFileContent': c.get('quotedFileContent'),
+                    }
+            if attempt + 1 < self.harvest_attempts:
+                time.sleep(self.harvest_delay)
+        raise LookupError(f"No anchored comment '{job['marker']}' in {job['file_id']}")
+
+    def recreate(self, job):
+        # A resumed job may have deleted the marker before create_comment
+        # failed; delete_comment returns False for it and the job carries on
+        self.drive.delete_comment(job['file_id'], job['marker_comment_id'])
+        created = self.drive.create_comment(
+            job['file_id'], job['comment'], job['anchor'], job.get('quotedFileContent')
+        )
+        return {'comment_id': created['id']}
+
+    # -- plumbing --
+
+    def _run_stage(self, stage, inbox, outbox):
+        self._local.drive = self.drive_factory()
+        work = getattr(self, stage)
+        stats = self.stats[stage]
+
+        while True:
+            job = inbox.get()
+            if job is None:
+                if outbox is not None:
+                    outbox.put(None)
+                return
+
+            saved = self.checkpoints.get(job['id'], stage)
+            if saved is not None:
+                job.update(saved)
+                stats.resumed += 1
+            else:
+                started = time.perf_counter()
+                try:
+                    result = work(job)
+                except Exception as e:
+                    stats.failed += 1
+                    self.failures.append((job['id'], stage, e))
+                    continue
+                finished = time.perf_counter()
+                stats.busy += finished - started
+                stats.first = stats.first or started
+                stats.last = finished
+                stats.done += 1
+                job.update(result)
+                self.checkpoints.put(job['id'], stage, result)
+
+            if outbox is not None:
+                outbox.put(job)
+            else:
+                self.completed.append(job)
+
+    def run(self, jobs):
+        """Process jobs; returns the list of jobs that finished every stage."""
+        self.completed = []
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in STAGES]
+        threads = []
+        for i, stage in enumerate(STAGES):
+            outbox = queues[i + 1] if i + 1 < len(STAGES) else None
+            t = threading.Thread(target=self._run_stage, args=(stage, queues[i], outbox), name=stage)
+            t.start()
+            threads.append(t)
+
+        for job in jobs:
+            queues[0].put(dict(job))
+        queues[0].put(None)
+
+        for t in threads:
+            t.join()
+        return self.completed
+
+
+def load_jobs(path: str):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    args = sys.argv[1:]
+    fake = '--fake' in args
+    if fake:
+        args.remove('--fake')
+    queue_size = 4
+    if '--queue-size' in args:
+        i = args.index('--queue-size')
+        queue_size = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) < 2:
+        print("Usage: python hybrid_pipeline.py <jobs.jsonl> <workdir> [--fake] [--queue-size N]")
+        sys.exit(1)
+
+    jobs = load_jobs(args[0])
+    workdir = args[1]
+    os.makedirs(workdir, exist_ok=True)
+
+    if fake:
+        fake_drive = FakeDrive()
+        drive_factory = lambda: FakeDriveClient(fake_drive)
+    else:
+        token = os.environ.get('GOOGLE_OAUTH_TOKEN')
+        if not token:
+            print("ERROR: set GOOGLE_OAUTH_TOKEN (or use --fake)")
+            sys.exit(1)
+        drive_factory = lambda: RestDriveClient(token)
+
+    print(f"\n=== Test 4 Hybrid Pipeline ===\n")
+    print(f"Jobs:       {len(jobs)}")
+    print(f"Workdir:    {workdir}")
+    print(f"Drive:      {'in-memory fake' if fake else 'Drive v3'}")
+    print(f"Queue size: {queue_size}")
+
+    checkpoints = Checkpoints(os.path.join(workdir, 'checkpoints.db'))
+    pipeline = HybridPipeline(drive_factory, workdir, checkpoints, queue_size)
+
+    started = time.perf_counter()
+    completed = pipeline.run(jobs)
+    elapsed = time.perf_counter() - started
+    checkpoints.close()
+
+    print(f"\n{'Stage':<10} {'done':>6} {'resumed':>8} {'failed':>7} {'busy s':>8} {'docs/s':>8}")
+    for stage in STAGES:
+        s = pipeline.stats[stage]
+        window = (s.last - s.first) if s.done and s.last > s.first else 0
+        rate = s.done / window if window else 0
+        print(f"{stage:<10} {s.done:>6} {s.resumed:>8} {s.failed:>7} {s.busy:>8.2f} {rate:>8.1f}")
+
+    print(f"\n✓ {len(completed)}/{len(jobs)} job(s) complete in {elapsed:.2f}s")
+    for job_id, stage, error in pipeline.failures:
+        print(f"✗ {job_id} failed at {stage}: {error}")
+
+    if pipeline.failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
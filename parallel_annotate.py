@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Parallel Annotation of One Large Document
+
+annotate.py handles one document on one core, and for a document with tens of
+thousands of paragraphs and thousands of targets nearly all of that time is
+spent matching targets against paragraphs. This splits the body paragraphs
+into contiguous shards and does the work in worker processes on serialized
+XML fragments:
+
+    1. match   each worker finds, per annotation, the first paragraph of its
+               shard containing the target (text_matching.find_match)
+    2. merge   the parent keeps the earliest match across shards - the same
+               paragraph add_comment would pick - skips comments already
+               present, and creates the w:comment entries, which gives every
+               range a document-wide unique comment id
+    3. split   workers split runs (split_runs_at_span) and place the range
+               markers with those ids, only for paragraphs that got a comment;
+               the parent swaps the returned paragraphs into the body
+
+The spec format and the report are the same as annotate.py.
+
+Usage:
+    python parallel_annotate.py input.docx output.docx spec.json [--workers N] [--shards N]
+
+Example:
+    python parallel_annotate.py big.docx big_annotated.docx spec.json --workers 8
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from docx import Document
+from docx.oxml import parse_xml
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from annotate import load_spec, normalize_spec
+from bulk_comments import BulkCommentWriter
+from comment_dedupe import comment_fingerprint, existing_fingerprints
+from comment_model import iter_comments
+from test4_docx_anchor_generator import split_runs_at_span
+from text_matching import find_match
+
+
+def _paragraph(fragment: bytes) -> Paragraph:
+    return Paragraph(parse_xml(fragment), None)
+
+
+def match_shard(shard):
+    """
+    Worker: shard is (first paragraph index, [paragraph XML], annotations).
+    Returns {annotation index: (paragraph index, start, end, matched text)}
+    for the first match of each annotation within the shard.
+    """
+    first_index, fragments, annotations = shard
+    found = {}
+    for offset, fragment in enumerate(fragments):
+        if len(found) == len(annotations):
+            break
+        text = ''.join(run.text for run in _paragraph(fragment).runs)
+        if not text:
+            continue
+        for i, a in enumerate(annotations):
+            if i in found or (a['match'] == 'exact' and a['target'] not in text):
+                continue
+            span = find_match(text, a['target'], a['match'])
+            if span is not None:
+                found[i] = (first_index + offset,) + span + (text[span[0]:span[1]],)
+    return found
+
+
+def split_paragraph(task):
+    """
+    Worker: task is (paragraph index, paragraph XML, [(start, end, comment id)]).
+    Returns (paragraph index, XML with runs split and comment ranges marked).
+    """
+    index, fragment, ranges = task
+    paragraph = _paragraph(fragment)
+    for start, end, comment_id in ranges:
+        runs = split_runs_at_span(paragraph, start, end)
+        if runs:
+            runs[0].mark_comment_range(runs[-1], comment_id)
+    return index, etree.tostring(paragraph._p)
+
+
+def parallel_annotate(input_file: str, output_file: str, annotations, workers: int = None, shards: int = None):
+    """
+    Sharded equivalent of annotate.annotate_document.
+
+    Returns a report: {'added': n, 'skipped': n, 'missing': [target, ...]}.
+    """
+    workers = workers or os.cpu_count()
+    annotations = normalize_spec(annotations)
+    doc = Document(input_file)
+    body_paragraphs = [p._p for p in doc.paragraphs]
+    fragments = [etree.tostring(p) for p in body_paragraphs]
+
+    shards = max(1, min(shards or workers * 4, len(fragments)))
+    size = -(-len(fragments) // shards) if fragments else 0
+    shard_tasks = [(i, fragments[i:i + size], annotations) for i in range(0, len(fragments), size)] if size else []
+
+    report = {'added': 0, 'skipped': 0, 'missing': []}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1. match: shards come back in order, so the first hit seen is the earliest
+        first_match = {}
+        for found in pool.map(match_shard, shard_tasks):
+            for i, position in found.items():
+                first_match.setdefault(i, position)
+
+        # 2. merge: ids come from the comments part, so they are unique document-wide
+        seen = existing_fingerprints(doc, iter_comments(doc))
+        ranges_by_paragraph = {}
+        writer = BulkCommentWriter(doc)
+        for i, a in enumerate(annotations):
+            if i not in first_match:
+                report['missing'].append(a['target'])
+                continue
+            index, start, end, matched = first_match[i]
+            fingerprint = comment_fingerprint(matched, a['comment'], a['author'])
+            if fingerprint in seen:
+                report['skipped'] += 1
+                continue
+            seen.add(fingerprint)
+            comment_id = writer.new_comment(a['comment'], a['author'])
+            ranges_by_paragraph.setdefault(index, []).append((start, end, comment_id))
+            report['added'] += 1
+        writer.flush()
+
+        # 3. split: only paragraphs that received a comment go back to the workers
+        tasks = [(index, fragments[index], ranges) for index, ranges in ranges_by_paragraph.items()]
+        for index, fragment in pool.map(split_paragraph, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+            old = body_paragraphs[index]
+            old.addprevious(parse_xml(fragment))
+            old.getparent().remove(old)
+
+    doc.save(output_file)
+    return report
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    shards = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    if '--shards' in args:
+        i = args.index('--shards')
+        shards = int(args[i + 1])
+        del args[i:i + 2]
+
+    if len(args) < 3:
+        print("Usage: python parallel_annotate.py <input.docx> <output.docx> <spec.json> [--workers N] [--shards N]")
+        sys.exit(1)
+
+    input_file, output_file, spec_file = args[:3]
+    try:
+        annotations = load_spec(spec_file)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    print(f"\n=== Parallel Annotation ===\n")
+    print(f"Input:       {input_file}")
+    print(f"Output:      {output_file}")
+    print(f"Annotations: {len(annotations)}")
+    print(f"Workers:     {workers or os.cpu_count()}")
+
+    started = time.perf_counter()
+    report = parallel_annotate(input_file, output_file, annotations, workers, shards)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n✓ Added {report['added']} comment(s), skipped {report['skipped']} already present ({elapsed:.2f}s)")
+    for target in report['missing']:
+        print(f"✗ Could not find target text: '{target}'")
+    print(f"✓ Saved: {output_file}")
+
+    if report['missing']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
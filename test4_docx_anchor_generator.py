@@ -7,7 +7,9 @@ The comment will generate a kix anchor when uploaded to Google Docs.
 That anchor can then be reused via Drive API for account-linked comments.
 
 Usage:
-    python test4_docx_anchor_generator.py input.docx output.docx "target text" "comment text"
+    python test4_docx_anchor_generator.py input.docx output.docx "target text" "comment text" [--match MODE]
+
+MODE is exact (default), normalized, regex or fuzzy - see text_matching.py.
 
 Example:
     python test4_docx_anchor_generator.py test_input.docx test_anchored.docx "quick brown fox" "ANCHOR GENERATOR"
@@ -18,23 +20,37 @@ import copy
 from docx import Document
 from docx.oxml.ns import qn
 
+from comment_dedupe import comment_fingerprint, existing_fingerprints
+from text_matching import MATCH_MODES, find_match
+from comment_model import iter_comments
 
-def split_run_at_text(paragraph, target_text: str):
-    """Find target_text and split runs to isolate it."""
-    full_text = ""
-    run_boundaries = []
 
-    for i, run in enumerate(paragraph.runs):
-        start = len(full_text)
-        full_text += run.text
-        end = len(full_text)
-        run_boundaries.append((start, end, i))
+def split_run_at_text(paragraph, target_text: str, mode: str = 'exact'):
+    """Find target_text (using the given match mode) and split runs to isolate it."""
+    full_text = ''.join(run.text for run in paragraph.runs)
 
-    target_start = full_text.find(target_text)
-    if target_start == -1:
+    span = find_match(full_text, target_text, mode)
+    if span is None:
         return None
 
-    target_end = target_start + len(target_text)
+    return split_runs_at_span(paragraph, *span)
+
+
+def split_runs_at_span(paragraph, target_start: int, target_end: int):
+    """
+    Split runs so that characters [target_start, target_end) of the paragraph's
+    run text are covered by whole runs, and return those runs.
+    """
+    # Taken once: splitting inserts runs, which shifts paragraph.runs indices
+    runs = paragraph.runs
+    run_boundaries = []
+    position = 0
+
+    for i, run in enumerate(runs):
+        start = position
+        position += len(run.text)
+        run_boundaries.append((start, position, i))
+
     runs_to_split = []
 
     for start, end, run_idx in run_boundaries:
@@ -51,7 +67,7 @@ def split_run_at_text(paragraph, target_text: str):
 
     for split_info in runs_to_split:
         run_idx = split_info['run_idx']
-        run = paragraph.runs[run_idx]
+        run = runs[run_idx]
         run_text = run.text
 
         t_start = split_info['target_start_in_run']
@@ -86,25 +102,56 @@ def split_run_at_text(paragraph, target_text: str):
     return target_runs
 
 
-def add_comment(doc: Document, target_text: str, comment_text: str, author: str = "Anchor Generator"):
-    """Add a comment to the target text."""
+def find_target_span(doc: Document, target_text: str, mode: str = 'exact'):
+    """
+    Return (paragraph, start, end) for the first match of target_text, with
+    offsets into the paragraph's run text, or None. Nothing is split.
+    """
     for paragraph in doc.paragraphs:
-        if target_text in paragraph.text:
-            target_runs = split_run_at_text(paragraph, target_text)
-            if target_runs:
-                doc.add_comment(
-                    runs=target_runs,
-                    text=comment_text,
-                    author=author,
-                    initials="AG"
-                )
-                return True
-    return False
+        if mode != 'exact' or target_text in paragraph.text:
+            full_text = ''.join(run.text for run in paragraph.runs)
+            span = find_match(full_text, target_text, mode)
+            if span is not None:
+                return (paragraph,) + span
+    return None
+
+
+def add_comment(doc: Document, target_text: str, comment_text: str, author: str = "Anchor Generator",
+                mode: str = 'exact', seen=None):
+    """
+    Add a comment to the target text.
+
+    Returns 'added', or None if the target was not found. If seen (a set of
+    comment_dedupe fingerprints) is given and a comment with this text and
+    author already covers the matched text, the document is left untouched
+    and 'skipped' is returned.
+    """
+    found = find_target_span(doc, target_text, mode)
+    if found is None:
+        return None
+    paragraph, start, end = found
+
+    # Fingerprint what the comment would cover - in regex/fuzzy mode that is
+    # not target_text itself - before any run is split
+    matched = ''.join(run.text for run in paragraph.runs)[start:end]
+    fingerprint = comment_fingerprint(matched, comment_text, author)
+    if seen is not None:
+        if fingerprint in seen:
+            return 'skipped'
+        seen.add(fingerprint)
+
+    doc.add_comment(
+        runs=split_runs_at_span(paragraph, start, end),
+        text=comment_text,
+        author=author,
+        initials="AG"
+    )
+    return 'added'
 
 
 def main():
     if len(sys.argv) < 5:
-        print("Usage: python test4_docx_anchor_generator.py <input.docx> <output.docx> <target_text> <comment_text>")
+        print("Usage: python test4_docx_anchor_generator.py <input.docx> <output.docx> <target_text> <comment_text> [--match MODE]")
         print("\nExample:")
         print('  python test4_docx_anchor_generator.py test_input.docx test_anchored.docx "quick brown fox" "ANCHOR GENERATOR"')
         sys.exit(1)
@@ -113,16 +160,36 @@ def main():
     output_file = sys.argv[2]
     target_text = sys.argv[3]
     comment_text = sys.argv[4]
+    mode = 'exact'
+    if len(sys.argv) > 6 and sys.argv[5] == '--match':
+        mode = sys.argv[6]
+        if mode not in MATCH_MODES:
+            print(f"Unknown match mode '{mode}' (expected one of {', '.join(MATCH_MODES)})")
+            sys.exit(1)
 
     print(f"\n=== Test 4: DOCX Anchor Generator ===\n")
     print(f"Input:   {input_file}")
     print(f"Output:  {output_file}")
     print(f"Target:  '{target_text}'")
     print(f"Comment: '{comment_text}'")
+    if mode != 'exact':
+        print(f"Match:   {mode}")
 
     doc = Document(input_file)
 
-    if add_comment(doc, target_text, comment_text):
+    # Re-running on an already-annotated file must not stack a second copy
+    seen = existing_fingerprints(doc, iter_comments(doc))
+    try:
+        result = add_comment(doc, target_text, comment_text, mode=mode, seen=seen)
+    except ValueError as e:
+        print(f"\n✗ {e}")
+        sys.exit(1)
+
+    if result == 'skipped':
+        doc.save(output_file)
+        print(f"\n✓ Comment already present on '{target_text}' - nothing added")
+        print(f"✓ Saved: {output_file}")
+    elif result == 'added':
         doc.save(output_file)
         print(f"\n✓ Comment added to '{target_text}'")
         print(f"✓ Saved: {output_file}")
@@ -16,52 +16,59 @@ Steps:
 """
 
 import sys
-import copy
 from docx import Document
 from docx.oxml.ns import qn
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
 
+from comment_dedupe import comment_fingerprint, existing_fingerprints
+from comment_model import CommentRecord, iter_comments_in_file
+from test4_docx_anchor_generator import find_target_span, split_runs_at_span
 
-def list_existing_comments(doc: Document):
+
+def list_existing_comments(doc: Document, verbose: bool = True):
     """List all existing comments in the document."""
-    print("\n=== Existing Comments ===")
+    if verbose:
+        print("\n=== Existing Comments ===")
 
     # Access comments through the document's part
     try:
-        comments_part = doc.part.comments_part
+        try:
+            comments_part = doc.part.part_related_by(RT.COMMENTS)
+        except KeyError:
+            comments_part = None
+
         if comments_part is None:
-            print("No comments found in document.")
+            if verbose:
+                print("No comments found in document.")
             return []
 
         comments_element = comments_part.element
         comments = comments_element.findall(qn('w:comment'))
 
         if not comments:
-            print("No comments found in document.")
+            if verbose:
+                print("No comments found in document.")
             return []
 
-        print(f"Found {len(comments)} comment(s):\n")
+        if verbose:
+            print(f"Found {len(comments)} comment(s):\n")
 
         comment_list = []
         for comment in comments:
-            comment_id = comment.get(qn('w:id'))
-            author = comment.get(qn('w:author'))
-            date = comment.get(qn('w:date'))
-
-            # Get comment text
-            text_elements = comment.findall('.//' + qn('w:t'))
-            text = ''.join(t.text for t in text_elements if t.text)
+            record = CommentRecord.from_element(comment)
 
-            print(f"  Comment ID: {comment_id}")
-            print(f"  Author: {author}")
-            print(f"  Date: {date}")
-            print(f"  Text: '{text}'")
-            print()
+            if verbose:
+                print(f"  Comment ID: {record.id}")
+                print(f"  Author: {record.author}")
+                print(f"  Date: {record.date}")
+                print(f"  Text: '{record.text}'")
+                print()
 
             comment_list.append({
-                'id': comment_id,
-                'author': author,
-                'date': date,
-                'text': text
+                'id': record.id,
+                'author': record.author,
+                'date': record.date,
+                'text': record.text
             })
 
         return comment_list
@@ -90,87 +97,33 @@ def find_comment_anchors(doc: Document):
                 print(f"  commentRangeEnd id={re.get(qn('w:id'))}")
 
 
-def split_run_at_text(paragraph, target_text: str):
-    """Find target_text and split runs to isolate it."""
-    full_text = ""
-    run_boundaries = []
+def add_new_comment(doc: Document, target_text: str, comment_text: str, author: str = "Python Script", seen=None):
+    """
+    Add a new comment to target text.
 
-    for i, run in enumerate(paragraph.runs):
-        start = len(full_text)
-        full_text += run.text
-        end = len(full_text)
-        run_boundaries.append((start, end, i))
-
-    target_start = full_text.find(target_text)
-    if target_start == -1:
+    Returns 'added', or None if the target was not found. If `seen` (a set
+    from `existing_fingerprints`) already holds an identical comment on the
+    same text, nothing is added and 'skipped' is returned.
+    """
+    found = find_target_span(doc, target_text)
+    if found is None:
         return None
 
-    target_end = target_start + len(target_text)
-
-    runs_to_split = []
-    for start, end, run_idx in run_boundaries:
-        if start < target_end and end > target_start:
-            runs_to_split.append({
-                'run_idx': run_idx,
-                'run_start': start,
-                'run_end': end,
-                'target_start_in_run': max(0, target_start - start),
-                'target_end_in_run': min(end - start, target_end - start)
-            })
-
-    target_runs = []
-
-    for split_info in runs_to_split:
-        run_idx = split_info['run_idx']
-        run = paragraph.runs[run_idx]
-        run_text = run.text
-
-        t_start = split_info['target_start_in_run']
-        t_end = split_info['target_end_in_run']
-
-        before_text = run_text[:t_start]
-        target_part = run_text[t_start:t_end]
-        after_text = run_text[t_end:]
-
-        if before_text == "" and after_text == "":
-            target_runs.append(run)
-        else:
-            run_element = run._element
-
-            if before_text:
-                new_run_before = copy.deepcopy(run_element)
-                for t in new_run_before.findall(qn('w:t')):
-                    t.text = before_text
-                run_element.addprevious(new_run_before)
+    # Checked before any run is split, so a skipped rerun leaves the document as it was
+    fingerprint = comment_fingerprint(target_text, comment_text, author)
+    if seen is not None and fingerprint in seen:
+        return 'skipped'
 
-            if after_text:
-                new_run_after = copy.deepcopy(run_element)
-                for t in new_run_after.findall(qn('w:t')):
-                    t.text = after_text
-                run_element.addnext(new_run_after)
-
-            for t in run_element.findall(qn('w:t')):
-                t.text = target_part
-
-            target_runs.append(run)
-
-    return target_runs
-
-
-def add_new_comment(doc: Document, target_text: str, comment_text: str, author: str = "Python Script"):
-    """Add a new comment to target text."""
-    for paragraph in doc.paragraphs:
-        if target_text in paragraph.text:
-            target_runs = split_run_at_text(paragraph, target_text)
-            if target_runs:
-                doc.add_comment(
-                    runs=target_runs,
-                    text=comment_text,
-                    author=author,
-                    initials=author[:2].upper()
-                )
-                return True
-    return False
+    paragraph, start, end = found
+    doc.add_comment(
+        runs=split_runs_at_span(paragraph, start, end),
+        text=comment_text,
+        author=author,
+        initials=author[:2].upper()
+    )
+    if seen is not None:
+        seen.add(fingerprint)
+    return 'added'
 
 
 def main():
@@ -204,37 +157,43 @@ def main():
     # Show where comments are anchored
     find_comment_anchors(doc)
 
-    # Add a new comment
+    # Add a new comment (skipped if an earlier run already added it)
     print("\n=== Adding New Comment ===")
     target = "quick brown fox"
     new_comment = "NEW COMMENT: Added programmatically - testing preservation"
+    seen = existing_fingerprints(doc, existing_comments)
 
-    if add_new_comment(doc, target, new_comment):
-        print(f"✓ Added new comment to: '{target}'")
-    else:
+    result = add_new_comment(doc, target, new_comment, seen=seen)
+    if result is None:
         # Try alternate target
         target = "Lorem ipsum"
-        if add_new_comment(doc, target, new_comment):
-            print(f"✓ Added new comment to: '{target}'")
-        else:
-            print("✗ Could not find target text for new comment")
-            print("  Will save anyway to test existing comment preservation")
+        result = add_new_comment(doc, target, new_comment, seen=seen)
+
+    if result == 'added':
+        print(f"✓ Added new comment to: '{target}'")
+    elif result == 'skipped':
+        print(f"✓ Comment already present on '{target}' - nothing added")
+    else:
+        print("✗ Could not find target text for new comment")
+        print("  Will save anyway to test existing comment preservation")
 
     # Save
     doc.save(output_file)
     print(f"\n✓ Saved: {output_file}")
 
-    # Verify output
+    # Verify output by streaming the saved comments rather than reloading the document
     print("\n=== Verifying Output File ===")
-    doc_verify = Document(output_file)
-    final_comments = list_existing_comments(doc_verify)
+    final_count = 0
+    for record in iter_comments_in_file(output_file):
+        print(f"  [{record.id}] {record.author}: '{record.text}'")
+        final_count += 1
 
     print(f"\n{'='*50}")
     print("SUMMARY")
     print(f"{'='*50}")
     print(f"Existing comments in input:  {len(existing_comments)}")
-    print(f"Total comments in output:    {len(final_comments)}")
-    print(f"New comments added:          {len(final_comments) - len(existing_comments)}")
+    print(f"Total comments in output:    {final_count}")
+    print(f"New comments added:          {final_count - len(existing_comments)}")
 
     print("\n=== Next Steps ===")
     print("1. Upload output file to Google Drive")
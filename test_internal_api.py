@@ -5,11 +5,21 @@ Test 6: Internal Google Docs API
 Attempts to use the internal /save and /docos/p/sync endpoints
 to create anchored comments, based on HAR file analysis.
 
+Multi-tab documents: every tab has its own index space and its own revision
+stream, and both endpoints take a `tab` parameter. Tabs and their latest
+revisions are discovered from the HAR (any request carrying tab=...). A batch
+of comments is grouped by tab; each tab's comments go out in order on their
+own thread and session, so different tabs are annotated concurrently.
+
 WARNING: This is experimental and may not work. It relies on
 undocumented internal APIs that could change at any time.
 
 Usage:
-    python test_internal_api.py network_capture.har "target text" "comment text"
+    python test_internal_api.py network_capture.har <start> <end> "quoted text" "comment text" [--tab t.0]
+    python test_internal_api.py network_capture.har --batch comments.json [--workers N]
+    python test_internal_api.py network_capture.har --list-tabs
+
+comments.json is a list of {"tab": "t.0", "start": 282, "end": 326, "quoted": "...", "comment": "..."}.
 """
 
 import json
@@ -18,9 +28,14 @@ import re
 import random
 import string
 import time
-from urllib.parse import unquote, urlencode, quote
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlparse
 import requests
 
+DEFAULT_TAB = 't.0'
+
 
 def generate_kix_anchor():
     """Generate a random kix anchor ID."""
@@ -49,6 +64,7 @@ def extract_session_from_har(har_path):
         'token': None,
         'ouid': None,
         'revision': None,
+        'tabs': discover_tabs(har),
     }
 
     for entry in har['log']['entries']:
@@ -80,9 +96,60 @@ def extract_session_from_har(har_path):
 
             break
 
+    # Single-tab HARs carry no tab parameter at all
+    if not session_data['tabs'] and session_data['revision'] is not None:
+        session_data['tabs'][DEFAULT_TAB] = session_data['revision']
+
     return session_data
 
 
+def discover_tabs(har):
+    """
+    Return {tab id: latest revision seen} for every tab referenced in the HAR.
+
+    Tabs come from the `tab` query parameter of any request; revisions from
+    the rev= field of /save bodies sent for that tab (None if never saved).
+    """
+    tabs = {}
+    for entry in har['log']['entries']:
+        req = entry['request']
+        tab = parse_qs(urlparse(req['url']).query).get('tab', [None])[0]
+        if not tab:
+            continue
+        tabs.setdefault(tab, None)
+
+        if '/save?' in req['url'] and 'postData' in req:
+            match = re.search(r'rev=(\d+)', unquote(req['postData'].get('text', '')))
+            if match and (tabs[tab] is None or int(match.group(1)) > tabs[tab]):
+                tabs[tab] = int(match.group(1))
+    return tabs
+
+
+class TabRevisions:
+    """
+    Per-tab revision counters; each tab's revision stream advances independently.
+
+    A tab advances only when a /save carrying its next revision succeeds, so a
+    failed request does not leave a gap in the stream.
+    """
+
+    def __init__(self, tabs):
+        self.revisions = {tab: rev for tab, rev in tabs.items() if rev is not None}
+        self.lock = threading.Lock()
+
+    def peek(self, tab):
+        """Return the revision the next /save for tab should carry."""
+        with self.lock:
+            if tab not in self.revisions:
+                raise KeyError(f"No /save revision in HAR for tab {tab}")
+            return self.revisions[tab] + 1
+
+    def commit(self, tab, rev):
+        """Record that a /save for tab was accepted at rev."""
+        with self.lock:
+            self.revisions[tab] = rev
+
+
 def get_document_text(session_data):
     """
     Fetch the document to get current text and revision.
@@ -93,12 +160,28 @@ def get_document_text(session_data):
     return None
 
 
-def create_anchored_comment(session_data, start_index, end_index, quoted_text, comment_text):
+def create_anchored_comment(session_data, start_index, end_index, quoted_text, comment_text,
+                            tab=DEFAULT_TAB, new_rev=None, http=None, verbose=True, on_saved=None):
     """
     Attempt to create an anchored comment using internal API.
+
+    start_index/end_index are positions in `tab`'s own index space. new_rev
+    is the revision to send for that tab (default: the tab's HAR revision + 1);
+    http is the requests session to use (default: module-level requests).
+    on_saved is called once the /save request has been accepted.
     """
     doc_id = session_data['doc_id']
     cookies = session_data['cookies']
+    http = http or requests
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    def error(message):
+        # Failures are printed even when verbose=False, tagged with the target
+        if verbose:
+            print(message)
+        else:
+            # One write per line, so lines from concurrent tabs do not interleave
+            print(f"  ✗ [{tab}] {start_index}-{end_index}: {message.strip()}\n", end='')
 
     # Generate IDs
     kix_anchor = generate_kix_anchor()
@@ -106,15 +189,21 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
     timestamp = int(time.time() * 1000)
 
     # Increment revision (this is a guess - may need current rev from server)
-    new_rev = session_data['revision'] + 1
+    if new_rev is None:
+        tab_rev = session_data['tabs'].get(tab)
+        if tab_rev is None:
+            error(f"  ERROR: No /save revision in HAR for tab {tab}")
+            return False
+        new_rev = tab_rev + 1
 
-    print(f"\n=== Attempting Internal API Comment ===")
-    print(f"Document ID: {doc_id}")
-    print(f"Target indices: {start_index} - {end_index}")
-    print(f"Generated anchor: {kix_anchor}")
-    print(f"Comment ID: {comment_id}")
-    print(f"Revision: {session_data['revision']} -> {new_rev}")
-    print()
+    log(f"\n=== Attempting Internal API Comment ===")
+    log(f"Document ID: {doc_id}")
+    log(f"Tab: {tab}")
+    log(f"Target indices: {start_index} - {end_index}")
+    log(f"Generated anchor: {kix_anchor}")
+    log(f"Comment ID: {comment_id}")
+    log(f"Revision: {new_rev - 1} -> {new_rev}")
+    log()
 
     # Step 1: Create the anchor via /save
     save_url = f"https://docs.google.com/document/d/{doc_id}/save"
@@ -130,7 +219,7 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
         'ouid': session_data['ouid'],
         'includes_info_params': 'true',
         'cros_files': 'false',
-        'tab': 't.0',
+        'tab': tab,
     }
 
     save_body = {
@@ -163,12 +252,12 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
     }
 
-    print("Step 1: Sending /save request to create anchor...")
-    print(f"  URL: {save_url}")
-    print(f"  Body: {save_body}")
+    log("Step 1: Sending /save request to create anchor...")
+    log(f"  URL: {save_url}")
+    log(f"  Body: {save_body}")
 
     try:
-        response = requests.post(
+        response = http.post(
             save_url,
             params=save_params,
             data=save_body,
@@ -176,17 +265,20 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
             cookies=cookies,
             timeout=30
         )
-        print(f"  Response status: {response.status_code}")
-        print(f"  Response preview: {response.text[:500]}...")
+        log(f"  Response status: {response.status_code}")
+        log(f"  Response preview: {response.text[:500]}...")
 
         if response.status_code != 200:
-            print("  FAILED - anchor creation unsuccessful")
+            error(f"  FAILED - anchor creation unsuccessful (HTTP {response.status_code}: {response.text[:200]})")
             return False
 
     except Exception as e:
-        print(f"  ERROR: {e}")
+        error(f"  ERROR: /save request failed: {e}")
         return False
 
+    if on_saved:
+        on_saved()
+
     # Step 2: Create the comment via /docos/p/sync
     sync_url = f"https://docs.google.com/document/d/{doc_id}/docos/p/sync"
     sync_params = {
@@ -202,7 +294,7 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
         'ouid': session_data['ouid'],
         'includes_info_params': 'true',
         'cros_files': 'false',
-        'tab': 't.0',
+        'tab': tab,
     }
 
     # Comment payload structure (based on HAR analysis)
@@ -247,11 +339,11 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
 
     sync_body = {'p': json.dumps(comment_payload)}
 
-    print("\nStep 2: Sending /docos/p/sync request to create comment...")
-    print(f"  URL: {sync_url}")
+    log("\nStep 2: Sending /docos/p/sync request to create comment...")
+    log(f"  URL: {sync_url}")
 
     try:
-        response = requests.post(
+        response = http.post(
             sync_url,
             params=sync_params,
             data=sync_body,
@@ -259,37 +351,108 @@ def create_anchored_comment(session_data, start_index, end_index, quoted_text, c
             cookies=cookies,
             timeout=30
         )
-        print(f"  Response status: {response.status_code}")
-        print(f"  Response preview: {response.text[:500]}...")
+        log(f"  Response status: {response.status_code}")
+        log(f"  Response preview: {response.text[:500]}...")
 
         if response.status_code == 200:
-            print("\n✓ Requests completed! Check the document.")
+            log("\n✓ Requests completed! Check the document.")
             return True
         else:
-            print("\n✗ Comment sync failed")
+            error(f"\n✗ Comment sync failed (HTTP {response.status_code}: {response.text[:200]})")
             return False
 
     except Exception as e:
-        print(f"  ERROR: {e}")
+        error(f"  ERROR: /docos/p/sync request failed: {e}")
         return False
 
 
+def load_batch(path):
+    """Read a JSON list of {"tab", "start", "end", "quoted", "comment"} items."""
+    with open(path, 'r') as f:
+        items = json.load(f)
+    return [
+        {'tab': item.get('tab', DEFAULT_TAB), 'start': int(item['start']), 'end': int(item['end']),
+         'quoted': item['quoted'], 'comment': item['comment']}
+        for item in items
+    ]
+
+
+def missing_revisions(session_data, tabs):
+    """Return the tabs, in sorted order, that have no /save revision in the HAR."""
+    return sorted(tab for tab in set(tabs) if session_data['tabs'].get(tab) is None)
+
+
+def dispatch_batches(session_data, items, workers=None):
+    """
+    Create every comment in items, one thread per tab.
+
+    Within a tab the requests go out in order, each with the next revision of
+    that tab's stream; tabs do not share revisions or indices, so different
+    tabs run concurrently. Returns [(item, success)] in input order. Raises
+    ValueError if a tab has no /save revision in the HAR.
+    """
+    by_tab = defaultdict(list)
+    for position, item in enumerate(items):
+        by_tab[item['tab']].append((position, item))
+
+    unsaved = missing_revisions(session_data, by_tab)
+    if unsaved:
+        raise ValueError(f"No /save revision in HAR for tab(s): {', '.join(unsaved)}")
+
+    revisions = TabRevisions(session_data['tabs'])
+    results = [None] * len(items)
+
+    def run_tab(tab):
+        with requests.Session() as http:
+            for position, item in by_tab[tab]:
+                rev = revisions.peek(tab)
+                success = create_anchored_comment(
+                    session_data, item['start'], item['end'], item['quoted'], item['comment'],
+                    tab=tab, new_rev=rev, http=http, verbose=False,
+                    on_saved=lambda: revisions.commit(tab, rev),
+                )
+                results[position] = (item, success)
+
+    with ThreadPoolExecutor(max_workers=workers or len(by_tab) or 1) as pool:
+        list(pool.map(run_tab, by_tab))
+    return results
+
+
 def main():
-    if len(sys.argv) < 4:
-        print("Usage: python test_internal_api.py <har_file> <start_index> <end_index> <quoted_text> <comment_text>")
+    args = sys.argv[1:]
+    tab = DEFAULT_TAB
+    batch_file = None
+    workers = None
+    list_tabs = '--list-tabs' in args
+    if list_tabs:
+        args.remove('--list-tabs')
+    if '--tab' in args:
+        i = args.index('--tab')
+        tab = args[i + 1]
+        del args[i:i + 2]
+    if '--batch' in args:
+        i = args.index('--batch')
+        batch_file = args[i + 1]
+        del args[i:i + 2]
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+
+    if not args or (len(args) < 5 and not (batch_file or list_tabs)):
+        print("Usage: python test_internal_api.py <har_file> <start_index> <end_index> <quoted_text> <comment_text> [--tab t.0]")
+        print("       python test_internal_api.py <har_file> --batch <comments.json> [--workers N]")
+        print("       python test_internal_api.py <har_file> --list-tabs")
         print()
         print("Example:")
         print('  python test_internal_api.py network_capture.har 282 326 "target phrase" "My comment"')
         print()
         print("Note: You need to know the character indices of your target text.")
         print("These can be found by counting characters in the document.")
+        print("Indices are per tab: each tab of a multi-tab document starts at its own 0.")
         sys.exit(1)
 
-    har_file = sys.argv[1]
-    start_index = int(sys.argv[2])
-    end_index = int(sys.argv[3])
-    quoted_text = sys.argv[4]
-    comment_text = sys.argv[5]
+    har_file = args[0]
 
     print("Extracting session data from HAR file...")
     session_data = extract_session_from_har(har_file)
@@ -302,13 +465,53 @@ def main():
     print(f"  Session ID: {session_data['sid']}")
     print(f"  Revision: {session_data['revision']}")
     print(f"  Cookies found: {len(session_data['cookies'])}")
+    print(f"  Tabs found: {len(session_data['tabs'])}")
+    for tab_id, revision in session_data['tabs'].items():
+        print(f"    {tab_id}: revision {revision if revision is not None else '(not saved in HAR)'}")
+
+    if list_tabs:
+        return
+
+    if session_data['revision'] is None:
+        print("ERROR: No /save request with a revision in HAR file")
+        print("Make an edit in the document while capturing, so the current revision is recorded.")
+        sys.exit(1)
+
+    if batch_file:
+        items = load_batch(batch_file)
+        unsaved = missing_revisions(session_data, (item['tab'] for item in items))
+        if unsaved:
+            print(f"ERROR: No /save revision in HAR for tab(s): {', '.join(unsaved)}")
+            print("Make an edit in each of these tabs while capturing, so its revision is recorded.")
+            sys.exit(1)
+
+        print(f"\n=== Dispatching {len(items)} comment(s) across "
+              f"{len({item['tab'] for item in items})} tab(s) ===\n")
+        started = time.perf_counter()
+        results = dispatch_batches(session_data, items, workers)
+        elapsed = time.perf_counter() - started
+
+        for item, success in results:
+            mark = '✓' if success else '✗'
+            print(f"{mark} [{item['tab']}] {item['start']}-{item['end']} '{item['comment']}'")
+        failed = sum(1 for _, success in results if not success)
+        print(f"\n{len(results) - failed} succeeded, {failed} failed in {elapsed:.2f}s")
+        if failed:
+            sys.exit(1)
+        return
+
+    if missing_revisions(session_data, [tab]):
+        print(f"ERROR: No /save revision in HAR for tab {tab}")
+        print("Make an edit in this tab while capturing, so its revision is recorded.")
+        sys.exit(1)
 
     success = create_anchored_comment(
         session_data,
-        start_index,
-        end_index,
-        quoted_text,
-        comment_text
+        int(args[1]),
+        int(args[2]),
+        args[3],
+        args[4],
+        tab=tab,
     )
 
     if success:
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Target Text Matching
+
+Finds comment targets that are not byte-for-byte identical to the document
+text. Google Docs exports often contain curly quotes, non-breaking spaces and
+zero-width characters (the same ones isUsefulText() strips in
+chrome-extension/content.js), so a plain `target in paragraph.text` misses.
+
+Modes:
+    exact       plain substring search (the original behaviour)
+    normalized  quotes folded, zero-width characters dropped, whitespace collapsed
+    regex       Python regular expression against the original text
+    fuzzy       normalized text, allowing up to max_edits insertions/deletions/substitutions
+
+Matching runs on a normalized "shadow" copy of the text that records, for
+every character, its offset in the original text, so the returned span can
+be used directly for run splitting. Compiled patterns and shadow copies are
+kept in LRU caches so repeated targets and paragraphs are only prepared once.
+
+Usage:
+    python text_matching.py input.docx "target text" [mode]
+
+Example:
+    python text_matching.py test_input.docx "quick  brown  fox" normalized
+"""
+
+import re
+import sys
+from functools import lru_cache
+
+MATCH_MODES = ('exact', 'normalized', 'regex', 'fuzzy')
+
+QUOTE_MAP = {
+    '\u2018': "'", '\u2019': "'", '\u201A': "'", '\u201B': "'", '\u2032': "'",
+    '\u201C': '"', '\u201D': '"', '\u201E': '"', '\u201F': '"', '\u2033': '"',
+}
+
+# Same set as isUsefulText() in chrome-extension/content.js
+ZERO_WIDTH = frozenset('\u200B\u200C\u200D\uFEFF')
+
+
+@lru_cache(maxsize=4096)
+def shadow_index(text: str):
+    """
+    Return (normalized_text, offsets) for text.
+
+    offsets[i] is the index in `text` of normalized character i. Runs of
+    whitespace collapse to a single space mapped to the first of them.
+    """
+    chars = []
+    offsets = []
+    in_space = False
+
+    for i, ch in enumerate(text):
+        if ch in ZERO_WIDTH:
+            continue
+        if ch.isspace():
+            if in_space:
+                continue
+            in_space = True
+            ch = ' '
+        else:
+            in_space = False
+            ch = QUOTE_MAP.get(ch, ch)
+        chars.append(ch)
+        offsets.append(i)
+
+    return ''.join(chars), tuple(offsets)
+
+
+def normalize_text(text: str) -> str:
+    """Return the normalized form of text (see shadow_index)."""
+    return shadow_index(text)[0]
+
+
+def _to_original(offsets, start: int, end: int):
+    """Map a normalized [start, end) span back to the original text."""
+    if end <= start:
+        return None
+    return offsets[start], offsets[end - 1] + 1
+
+
+def _fuzzy_search(text: str, pattern: str, max_edits: int):
+    """
+    Find the substring of text closest to pattern (Sellers' algorithm).
+
+    Returns (start, end) of the best match within max_edits, or None.
+    """
+    m = len(pattern)
+    cost = list(range(m + 1))
+    starts = [0] * (m + 1)
+    best = None
+
+    for i, ch in enumerate(text):
+        new_cost = [0] * (m + 1)
+        new_starts = [i + 1] * (m + 1)
+
+        for j in range(1, m + 1):
+            c, s = cost[j - 1] + (pattern[j - 1] != ch), starts[j - 1]
+            if cost[j] + 1 < c:
+                c, s = cost[j] + 1, starts[j]
+            if new_cost[j - 1] + 1 < c:
+                c, s = new_cost[j - 1] + 1, new_starts[j - 1]
+            new_cost[j] = c
+            new_starts[j] = s
+
+        if new_cost[m] <= max_edits and (best is None or new_cost[m] < best[0]):
+            best = (new_cost[m], new_starts[m], i + 1)
+            if best[0] == 0:
+                break
+
+        cost, starts = new_cost, new_starts
+
+    return (best[1], best[2]) if best else None
+
+
+@lru_cache(maxsize=1024)
+def compile_matcher(target: str, mode: str = 'exact', max_edits=None):
+    """
+    Return a function text -> (start, end) or None for the given target.
+
+    Spans are always offsets into the original (un-normalized) text. Raises
+    ValueError for an unknown mode or a regex target that does not compile.
+    """
+    if mode == 'exact':
+        def match(text):
+            start = text.find(target)
+            return None if start == -1 else (start, start + len(target))
+        return match
+
+    if mode == 'regex':
+        try:
+            pattern = re.compile(target)
+        except re.error as e:
+            raise ValueError(f"Invalid regex target '{target}': {e}") from e
+
+        def match(text):
+            found = pattern.search(text)
+            return found.span() if found and found.end() > found.start() else None
+        return match
+
+    needle = normalize_text(target).strip()
+    if not needle:
+        return lambda text: None
+
+    if mode == 'normalized':
+        def match(text):
+            normalized, offsets = shadow_index(text)
+            start = normalized.find(needle)
+            if start == -1:
+                return None
+            return _to_original(offsets, start, start + len(needle))
+        return match
+
+    if mode == 'fuzzy':
+        limit = max(1, len(needle) // 10) if max_edits is None else max_edits
+
+        def match(text):
+            normalized, offsets = shadow_index(text)
+            if needle in normalized:
+                start = normalized.find(needle)
+                return _to_original(offsets, start, start + len(needle))
+            span = _fuzzy_search(normalized, needle, limit)
+            return _to_original(offsets, *span) if span else None
+        return match
+
+    raise ValueError(f"Unknown match mode '{mode}' (expected one of {', '.join(MATCH_MODES)})")
+
+
+def find_match(text: str, target: str, mode: str = 'exact', max_edits=None):
+    """Return the (start, end) span of target in text, or None if not found."""
+    return compile_matcher(target, mode, max_edits)(text)
+
+
+def main():
+    from docx import Document
+
+    if len(sys.argv) < 3:
+        print("Usage: python text_matching.py <input.docx> <target_text> [exact|normalized|regex|fuzzy]")
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    target_text = sys.argv[2]
+    mode = sys.argv[3] if len(sys.argv) > 3 else 'normalized'
+
+    print(f"\n=== Target Matching ({mode}) ===\n")
+    print(f"Input:  {input_file}")
+    print(f"Target: '{target_text}'")
+
+    try:
+        matcher = compile_matcher(target_text, mode)
+    except ValueError as e:
+        print(f"\n✗ {e}")
+        sys.exit(1)
+
+    doc = Document(input_file)
+    found = 0
+    for i, para in enumerate(doc.paragraphs):
+        span = matcher(para.text)
+        if span:
+            found += 1
+            print(f"  Para {i} [{span[0]}:{span[1]}]: '{para.text[span[0]:span[1]]}'")
+
+    if not found:
+        print(f"\n✗ No match for '{target_text}'")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Track Changes Generator
+
+Creates a .docx with Word track changes (w:del / w:ins revisions) so that the
+edits arrive in Google Docs as suggestions on import (see RESEARCH_FINDINGS.md
+section 5.4). Uses the same run splitting as the comment scripts to isolate
+the target text, then wraps it in a deletion and inserts the replacement.
+
+A whole batch of edits is applied in one pass over the paragraphs, with one
+combined matcher for every pending target, and the document is saved once.
+
+Usage:
+    python track_changes_generator.py input.docx output.docx "target text" "replacement"
+    python track_changes_generator.py input.docx output.docx --edits edits.json
+
+edits.json is a list of [target, replacement] pairs (or objects with
+"target" and "replacement" keys). An empty replacement is a pure deletion.
+
+Example:
+    python track_changes_generator.py test_input.docx test_suggestions.docx "quick brown fox" "slow red fox"
+"""
+
+import re
+import sys
+import copy
+import json
+import itertools
+from datetime import datetime, timezone
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from test4_docx_anchor_generator import split_runs_at_span
+
+
+def next_revision_id(doc: Document) -> int:
+    """Return the first revision id not used by any w:ins / w:del in the body."""
+    used = [
+        int(el.get(qn('w:id')))
+        for el in doc.element.body.iter(qn('w:ins'), qn('w:del'))
+        if (el.get(qn('w:id')) or '').isdigit()
+    ]
+    return max(used, default=-1) + 1
+
+
+def _revision(tag: str, revision_id: int, author: str, date: str):
+    """Create an empty w:ins or w:del element."""
+    element = OxmlElement(tag)
+    element.set(qn('w:id'), str(revision_id))
+    element.set(qn('w:author'), author)
+    element.set(qn('w:date'), date)
+    return element
+
+
+def _text_element(tag: str, text: str):
+    """Create a w:t / w:delText element that keeps leading and trailing spaces."""
+    element = OxmlElement(tag)
+    element.text = text
+    element.set(qn('xml:space'), 'preserve')
+    return element
+
+
+def mark_replacement(target_runs, replacement: str, author: str, date: str, revision_ids):
+    """
+    Wrap target_runs in a w:del and insert the replacement as a w:ins after it.
+
+    revision_ids is an iterator yielding unused revision ids.
+    """
+    first = target_runs[0]._element
+    deletion = _revision('w:del', next(revision_ids), author, date)
+    first.addprevious(deletion)
+
+    for run in target_runs:
+        r = run._element
+        # Deleted text must be stored as w:delText, not w:t
+        for t in r.findall(qn('w:t')):
+            r.replace(t, _text_element('w:delText', t.text or ''))
+        deletion.append(r)
+
+    if replacement:
+        insertion = _revision('w:ins', next(revision_ids), author, date)
+        new_run = OxmlElement('w:r')
+        rPr = first.find(qn('w:rPr'))
+        if rPr is not None:
+            new_run.append(copy.deepcopy(rPr))
+        new_run.append(_text_element('w:t', replacement))
+        insertion.append(new_run)
+        deletion.addnext(insertion)
+
+
+def _combined_matcher(targets):
+    """One regex matching any of targets, so each paragraph is searched once rather than once per target."""
+    return re.compile('|'.join(re.escape(t) for t in sorted(targets, key=len, reverse=True)))
+
+
+def apply_suggestions(doc: Document, edits, author: str = "Suggestion Generator"):
+    """
+    Apply a batch of (target_text, replacement) edits as tracked changes.
+
+    Each target is replaced at its first occurrence, matching the comment
+    scripts; a target listed n times is replaced at its first n occurrences.
+    Returns the list of targets that could not be found.
+    """
+    pending = {}
+    for target_text, replacement in edits:
+        if target_text:
+            pending.setdefault(target_text, []).append(replacement)
+
+    date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    revision_ids = itertools.count(next_revision_id(doc))
+    matcher = _combined_matcher(pending) if pending else None
+    lengths = sorted({len(t) for t in pending}, reverse=True)
+
+    for paragraph in doc.paragraphs:
+        if not pending:
+            break
+
+        # Run text once per paragraph - the same text split_runs_at_span counts in
+        text = ''.join(run.text for run in paragraph.runs)
+        spans = []
+        position = 0
+        while pending:
+            found = matcher.search(text, position)
+            if not found:
+                break
+            start = found.start()
+            # The matcher still knows targets that are used up; take the
+            # longest target at this position that has replacements left
+            target = next((text[start:start + n] for n in lengths if text[start:start + n] in pending), None)
+            if target is None:
+                position = start + 1
+                continue
+            replacements = pending[target]
+            spans.append((start, start + len(target), replacements.pop(0)))
+            if not replacements:
+                del pending[target]
+            position = start + len(target)
+
+        # Right to left: text before a span is untouched by marking it, so
+        # the offsets of the remaining spans stay valid
+        for start, end, replacement in reversed(spans):
+            target_runs = split_runs_at_span(paragraph, start, end)
+            mark_replacement(target_runs, replacement, author, date, revision_ids)
+
+    return [target for target, replacements in pending.items() for _ in replacements]
+
+
+def load_edits(path: str):
+    """Read a list of [target, replacement] pairs or {"target", "replacement"} objects."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    edits = []
+    for item in data:
+        if isinstance(item, dict):
+            edits.append((item['target'], item.get('replacement', '')))
+        else:
+            edits.append((item[0], item[1]))
+    return edits
+
+
+def main():
+    if len(sys.argv) < 5:
+        print("Usage: python track_changes_generator.py <input.docx> <output.docx> <target_text> <replacement>")
+        print("       python track_changes_generator.py <input.docx> <output.docx> --edits <edits.json>")
+        print("\nExample:")
+        print('  python track_changes_generator.py test_input.docx test_suggestions.docx "quick brown fox" "slow red fox"')
+        sys.exit(1)
+
+    input_file = sys.argv[1]
+    output_file = sys.argv[2]
+
+    if sys.argv[3] == '--edits':
+        edits = load_edits(sys.argv[4])
+    else:
+        edits = [(sys.argv[3], sys.argv[4])]
+
+    print(f"\n=== Track Changes Generator ===\n")
+    print(f"Input:  {input_file}")
+    print(f"Output: {output_file}")
+    print(f"Edits:  {len(edits)}")
+
+    doc = Document(input_file)
+    missing = apply_suggestions(doc, edits)
+    doc.save(output_file)
+
+    print(f"\n✓ Applied {len(edits) - len(missing)} suggestion(s)")
+    for target_text in missing:
+        print(f"✗ Could not find target text: '{target_text}'")
+    print(f"✓ Saved: {output_file}")
+    print("\n=== Next Steps ===")
+    print("1. Upload to Google Drive → Open with Google Docs")
+    print("2. Check that each edit shows up as a suggestion")
+
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()